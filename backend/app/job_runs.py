@@ -166,7 +166,7 @@ def parse_job_run_log(log_text: str) -> dict[str, Any]:
                     {"source": "binance", "symbol": symbol, "issue_type": "missing_price", "details": "No Binance price found."},
                 )
 
-        saved_match = re.search(r"\[(positions|prices|fx|valuations)\]\s+(CSV|Parquet) saved ->\s+(.+)$", line)
+        saved_match = re.search(r"\[(positions|prices|fx|valuations)\]\s+(CSV|Parquet|Feather) saved ->\s+(.+)$", line)
         if saved_match:
             resource, file_type, path = saved_match.groups()
             outputs.setdefault(resource, {})[file_type.lower()] = path
@@ -7,7 +7,13 @@ from time import time
 from typing import Dict, Iterable, List, Literal, Optional
 
 import pandas as pd
-from backend.app.snapshot_parsing import parse_optional_datetime, parse_snapshot_date, safe_float, safe_int
+from backend.app.snapshot_parsing import (
+    parse_optional_datetime,
+    parse_snapshot_date,
+    pick_snapshot_runs,
+    safe_float,
+    safe_int,
+)
 from backend.app.corporate_actions import CorporateAction, get_corporate_actions, parse_cedear_ratio
 from pydantic import BaseModel, Field
 
@@ -98,23 +104,17 @@ def _latest_dt_dirs(base_dir: Path) -> list[tuple[date, Path]]:
 
 
 def _pick_snapshot_file(dt_dir: Path, prefix: str) -> Optional[Path]:
-    parquet_files = sorted(dt_dir.glob(f"{prefix}*.parquet"), key=lambda p: p.stat().st_mtime, reverse=True)
-    if parquet_files:
-        return parquet_files[0]
-    csv_files = sorted(dt_dir.glob(f"{prefix}*.csv"), key=lambda p: p.stat().st_mtime, reverse=True)
-    if csv_files:
-        return csv_files[0]
-    return None
+    runs = pick_snapshot_runs(dt_dir.glob(f"{prefix}*"))
+    return runs[0] if runs else None
 
 
 def _collect_snapshot_files(dt_dir: Path, prefix: str) -> list[Path]:
-    parquet_files = sorted(dt_dir.rglob(f"{prefix}*.parquet"), key=lambda p: p.stat().st_mtime, reverse=True)
-    if parquet_files:
-        return parquet_files
-    return sorted(dt_dir.rglob(f"{prefix}*.csv"), key=lambda p: p.stat().st_mtime, reverse=True)
+    return pick_snapshot_runs(dt_dir.rglob(f"{prefix}*"))
 
 
 def _read_snapshot(path: Path) -> pd.DataFrame:
+    if path.suffix == ".feather":
+        return pd.read_feather(path)
     return pd.read_parquet(path) if path.suffix == ".parquet" else pd.read_csv(path)
 
 
@@ -1,10 +1,14 @@
 from __future__ import annotations
 
 from datetime import date, datetime
-from typing import Optional
+from pathlib import Path
+from typing import Iterable, Optional
 
 import pandas as pd
 
+# preferred first: Arrow IPC, then Parquet, then the legacy CSV sidecars
+SNAPSHOT_SUFFIXES = (".feather", ".parquet", ".csv")
+
 
 def safe_float(value) -> Optional[float]:
     if value is None:
@@ -56,3 +60,17 @@ def parse_optional_datetime(value) -> Optional[datetime]:
         except ValueError:
             return None
     return None
+
+
+def pick_snapshot_runs(files: Iterable[Path]) -> list[Path]:
+    """Return one file per snapshot run, newest run first.
+
+    Files sharing a stem were written by the same run, so the preferred format only
+    decides between them; a stale Feather file never hides a newer Parquet/CSV run.
+    """
+    runs: dict[Path, list[Path]] = {}
+    for path in files:
+        if path.suffix in SNAPSHOT_SUFFIXES:
+            runs.setdefault(path.with_suffix(""), []).append(path)
+    newest_first = sorted(runs.values(), key=lambda run: max(p.stat().st_mtime for p in run), reverse=True)
+    return [min(run, key=lambda p: SNAPSHOT_SUFFIXES.index(p.suffix)) for run in newest_first]
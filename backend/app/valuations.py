@@ -6,7 +6,13 @@ from pathlib import Path
 from typing import Optional
 
 import pandas as pd
-from backend.app.snapshot_parsing import parse_snapshot_date, parse_snapshot_datetime, safe_float, safe_int
+from backend.app.snapshot_parsing import (
+    parse_snapshot_date,
+    parse_snapshot_datetime,
+    pick_snapshot_runs,
+    safe_float,
+    safe_int,
+)
 from pydantic import BaseModel, Field
 
 
@@ -42,17 +48,16 @@ def _account_dir(dt_dir: Path, account_id: str) -> Path:
 
 
 def _pick_snapshot_file(account_dir: Path) -> Path:
-    # prefer parquet, fall back to csv
-    parquet_files = sorted(account_dir.glob("valuations_*.parquet"), key=lambda p: p.stat().st_mtime, reverse=True)
-    if parquet_files:
-        return parquet_files[0]
-    csv_files = sorted(account_dir.glob("valuations_*.csv"), key=lambda p: p.stat().st_mtime, reverse=True)
-    if csv_files:
-        return csv_files[0]
-    raise SnapshotNotFound(f"No valuation files under {account_dir}.")
+    # newest run wins; within a run prefer feather, then parquet, fall back to csv
+    runs = pick_snapshot_runs(account_dir.glob("valuations_*"))
+    if not runs:
+        raise SnapshotNotFound(f"No valuation files under {account_dir}.")
+    return runs[0]
 
 
 def _read_snapshot(path: Path) -> pd.DataFrame:
+    if path.suffix == ".feather":
+        return pd.read_feather(path)
     return pd.read_parquet(path) if path.suffix == ".parquet" else pd.read_csv(path)
 
 
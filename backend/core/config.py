@@ -19,6 +19,7 @@ DEFAULT_PPI_API_VERSION = settings.DEFAULT_PPI_API_VERSION
 OUTPUT_DIR = settings.OUTPUT_DIR
 S3_BUCKET = settings.S3_BUCKET
 S3_PREFIX = settings.S3_PREFIX
+EMIT_CSV = settings.EMIT_CSV
 
 IOL_USERNAME = settings.IOL_USERNAME
 IOL_PASSWORD = settings.IOL_PASSWORD
@@ -1,9 +1,12 @@
 from __future__ import annotations
 
 import json
+import logging
+import sys
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, date, timezone
 from math import nan
-from typing import Any
+from typing import Any, Iterable
 
 from backend.core.binance_client import get_account_balances
 from backend.core.binance_prices import fetch_binance_prices
@@ -29,8 +32,9 @@ from backend.core.config import (
     METAMASK_BTC_ADDRESSES,
     IOL_PASSWORD,
     IOL_USERNAME,
+    S3_BUCKET,
 )
-from backend.core.iol_client import get_bearer_tokens, get_positions
+from backend.core.iol_client import get_cached_bearer_tokens, get_positions
 from backend.core.iol_transform import extract_positions_as_df
 from backend.core.ppi_client import (
     get_balance_and_positions as get_ppi_balance_and_positions,
@@ -41,7 +45,10 @@ from backend.core.ppi_transform import positions_to_df as ppi_positions_to_df
 from backend.core.ppi_transform import (
     prices_from_positions as ppi_prices_from_positions,
 )
-from backend.core.storage import save_snapshot_files, maybe_upload_to_s3
+from backend.core.storage import (
+    maybe_upload_to_s3_multi,
+    save_snapshot_files,
+)
 from backend.core.iol_client import get_prices_for_positions, get_fx_rates
 from backend.core.santander_holdings import SantanderHolding, load_holdings
 from backend.core.santander_nav import fetch_share_values as fetch_santander_nav_values
@@ -59,6 +66,7 @@ from backend.valuation.models import (
     FXRate,
     Position as PositionModel,
     Price as PriceModel,
+    Valuation,
     compute_valuations,
 )
 import pandas as pd
@@ -70,26 +78,17 @@ def _print_section(title: str) -> None:
 
 
 def _log_snapshot_paths(resource: str, info: dict) -> None:
-    csv_path = info.get("csv")
-    parquet_path = info.get("parquet")
-    if csv_path:
-        print(f"[{resource}] CSV saved -> {csv_path}")
-        _log_job_detail(
-            {
-                "event": "output_saved",
-                "resource": resource,
-                "file_type": "csv",
-                "path": csv_path,
-            }
-        )
-    if parquet_path:
-        print(f"[{resource}] Parquet saved -> {parquet_path}")
+    for file_type, label in (("csv", "CSV"), ("parquet", "Parquet"), ("feather", "Feather")):
+        path = info.get(file_type)
+        if not path:
+            continue
+        print(f"[{resource}] {label} saved -> {path}")
         _log_job_detail(
             {
                 "event": "output_saved",
                 "resource": resource,
-                "file_type": "parquet",
-                "path": parquet_path,
+                "file_type": file_type,
+                "path": path,
             }
         )
 
@@ -114,6 +113,20 @@ POSITION_COLUMNS = [
     "valuation",
 ]
 
+# Price fields read back by the price-history API; valid_from_ts/valid_to_ts are
+# never populated by any source, so they are not persisted.
+PRICE_SNAPSHOT_FIELDS = (
+    "asof_dt",
+    "asof_ts",
+    "symbol",
+    "price_type",
+    "price",
+    "currency",
+    "venue",
+    "source",
+    "quality_score",
+)
+
 USDT_USD_RATE = 1.0
 VALID_ASSET_TYPES = {
     "equity",
@@ -253,7 +266,60 @@ def _normalized_asset_type(raw_value: Any) -> str | None:
     return normalized if normalized in VALID_ASSET_TYPES else None
 
 
+def _models_to_df(models: list, fields: Iterable[str]) -> pd.DataFrame:
+    """Build a frame column-wise from flat Pydantic models, skipping per-row model_dump dicts."""
+    return pd.DataFrame({field: [getattr(m, field) for m in models] for field in fields})
+
+
+def _build_position_models(
+    df: pd.DataFrame, *, snapshot_dt: date, snapshot_ts: datetime
+) -> list[PositionModel]:
+    """Build valuation inputs column-wise from the merged positions frame.
+
+    Rows are filtered and normalized here, so per-row Pydantic validation is
+    skipped with model_construct.
+    """
+    quantities = pd.to_numeric(df["quantity"], errors="coerce")
+    has_symbol = df["symbol"].notna() & (df["symbol"] != "")
+    mask = has_symbol & (quantities > 0)
+    eligible = df[mask]
+    if eligible.empty:
+        return []
+
+    text_columns = ["symbol", "account_id", "source", "market", "instrument_type", "currency"]
+    # NaN -> None so optional string fields hold real nulls
+    text = eligible[text_columns].astype(object)
+    text = text.where(text.notna(), None)
+    return [
+        PositionModel.model_construct(
+            snapshot_dt=snapshot_dt,
+            snapshot_ts=snapshot_ts,
+            account_id=account_id or ACCOUNT_ID,
+            source=source or "unknown",
+            market=market,
+            symbol=symbol,
+            asset_type=_normalized_asset_type(instrument_type),
+            quantity=quantity,
+            currency=currency,
+        )
+        for symbol, account_id, source, market, instrument_type, currency, quantity in zip(
+            text["symbol"].tolist(),
+            text["account_id"].tolist(),
+            text["source"].tolist(),
+            text["market"].tolist(),
+            text["instrument_type"].tolist(),
+            text["currency"].tolist(),
+            quantities[mask].tolist(),
+        )
+    ]
+
+
 def main():
+    # FX rates don't depend on any position source, so fetch them while the sources load.
+    fx_executor = ThreadPoolExecutor(max_workers=1)
+    fx_future = fx_executor.submit(get_fx_rates)
+    fx_executor.shutdown(wait=False)
+
     df = pd.DataFrame(columns=POSITION_COLUMNS)
     raw_items: list[dict[str, Any]] = []
     access_token: str | None = None
@@ -265,7 +331,7 @@ def main():
             password=IOL_PASSWORD,
             account_id=ACCOUNT_ID,
             position_columns=POSITION_COLUMNS,
-            get_bearer_tokens=get_bearer_tokens,
+            get_bearer_tokens=get_cached_bearer_tokens,
             get_positions=get_positions,
             extract_positions_as_df=extract_positions_as_df,
         )
@@ -416,17 +482,24 @@ def main():
     ):
         print(df.to_string(index=False))
 
-    # Save snapshot files (partitioned by date/source/account)
-    info = save_snapshot_files(df)
-    _print_section("Positions snapshot saved")
-    _log_snapshot_paths("positions", info)
-
-    # Optional: upload to S3 if configured
+    # Optional: also upload CSV files to S3 when configured
     upload_csv = False
-    if upload_csv:
-        maybe_upload_to_s3([info.get("csv"), info.get("parquet")], info.get("dt"))
-    else:
-        maybe_upload_to_s3([info.get("parquet")], info.get("dt"))
+    # S3 archives stay Parquet for queryability, with a Feather copy for the API's
+    # local reads; local-only runs let storage pick Feather for the (usually tiny) tables.
+    snapshot_fmt = "parquet+feather" if S3_BUCKET else "auto"
+
+    # Save snapshot files (partitioned by date/source/account). Each resource is
+    # saved on its own so one failed write doesn't lose the others; the uploads
+    # are batched at the end of the run.
+    snapshot_infos: dict[str, dict] = {}
+    info: dict = {}
+    try:
+        info = save_snapshot_files(df, fmt=snapshot_fmt)
+        snapshot_infos["positions"] = info
+        _print_section("Positions snapshot saved")
+        _log_snapshot_paths("positions", info)
+    except Exception as e:
+        print(f"[warn] Error saving positions snapshot: {e}")
 
     # Quick totals by currency
     try:
@@ -621,27 +694,15 @@ def main():
 
     if prices:
         try:
-            rows = [p.model_dump() for p in prices]
-            df_prices = pd.DataFrame(rows)
+            df_prices = _models_to_df(prices, PRICE_SNAPSHOT_FIELDS)
             if not df_prices.empty:
                 df_prices["account_id"] = ACCOUNT_ID
-            info_prices = save_snapshot_files(df_prices, resource_name="prices")
+            info_prices = save_snapshot_files(df_prices, resource_name="prices", fmt=snapshot_fmt)
+            snapshot_infos["prices"] = info_prices
             _print_section("Prices snapshot saved")
             _log_snapshot_paths("prices", info_prices)
-            if upload_csv:
-                maybe_upload_to_s3(
-                    [info_prices.get("csv"), info_prices.get("parquet")],
-                    info_prices.get("dt"),
-                    resource_name="prices",
-                )
-            else:
-                maybe_upload_to_s3(
-                    [info_prices.get("parquet")],
-                    info_prices.get("dt"),
-                    resource_name="prices",
-                )
         except Exception as e:
-            print(f"Error saving prices snapshot: {e}")
+            print(f"[warn] Error saving prices snapshot: {e}")
     else:
         print("No prices fetched from IOL, PPI, Santander, crypto, or Binance sources.")
 
@@ -662,32 +723,20 @@ def main():
 
     fx_rates = []
     try:
-        fx_rates = get_fx_rates()
+        fx_rates = fx_future.result()
         if extra_fx_rates:
             fx_rates.extend(extra_fx_rates)
         if fx_rates:
-            df_fx = pd.DataFrame([r.model_dump() for r in fx_rates])
+            df_fx = _models_to_df(fx_rates, FXRate.model_fields)
             info_fx = save_snapshot_files(
                 df_fx,
                 resource_name="fx",
                 source="dolarapi_blue_venta",
+                fmt=snapshot_fmt,
             )
+            snapshot_infos["fx"] = info_fx
             _print_section("FX rates saved")
             _log_snapshot_paths("fx", info_fx)
-            if upload_csv:
-                maybe_upload_to_s3(
-                    [info_fx.get("csv"), info_fx.get("parquet")],
-                    info_fx.get("dt"),
-                    resource_name="fx",
-                    source="dolarapi_blue_venta",
-                )
-            else:
-                maybe_upload_to_s3(
-                    [info_fx.get("parquet")],
-                    info_fx.get("dt"),
-                    resource_name="fx",
-                    source="dolarapi_blue_venta",
-                )
         else:
             print("No FX rates fetched.")
     except Exception as e:
@@ -706,72 +755,48 @@ def main():
         except ValueError:
             snapshot_dt = date.today()
 
-        pos_models = []
         snapshot_ts = datetime.now(timezone.utc)
-        for row in df.to_dict(orient="records"):
-            symbol = row.get("symbol")
-            if not symbol:
-                continue
-            try:
-                quantity = float(row.get("quantity") or 0.0)
-            except (TypeError, ValueError):
-                quantity = 0.0
-            if quantity <= 0:
-                continue
-            pos_models.append(
-                PositionModel(
-                    snapshot_dt=snapshot_dt,
-                    snapshot_ts=snapshot_ts,
-                    account_id=row.get("account_id") or ACCOUNT_ID,
-                    source=row.get("source") or "unknown",
-                    market=row.get("market"),
-                    symbol=symbol,
-                    asset_type=_normalized_asset_type(row.get("instrument_type")),
-                    quantity=quantity,
-                    currency=row.get("currency"),
-                )
-            )
+        pos_models = _build_position_models(
+            df, snapshot_dt=snapshot_dt, snapshot_ts=snapshot_ts
+        )
 
         if not pos_models:
             print("No positions to value.")
-            return
-
-        valuations = compute_valuations(
-            pos_models,
-            prices,
-            fx_rates,
-            base_currency=BASE_CURRENCY,
-            snapshot_dt=snapshot_dt,
-        )
-
-        if valuations:
-            df_valuations = pd.DataFrame([v.model_dump() for v in valuations])
-            info_val = save_snapshot_files(
-                df_valuations,
-                resource_name="valuations",
-                account_id=ACCOUNT_ID,
+        else:
+            valuations = compute_valuations(
+                pos_models,
+                prices,
+                fx_rates,
+                base_currency=BASE_CURRENCY,
+                snapshot_dt=snapshot_dt,
             )
-            _print_section("Valuations saved")
-            _log_snapshot_paths("valuations", info_val)
-            if upload_csv:
-                maybe_upload_to_s3(
-                    [info_val.get("csv"), info_val.get("parquet")],
-                    info_val.get("dt"),
+
+            if valuations:
+                df_valuations = _models_to_df(valuations, Valuation.model_fields)
+                info_val = save_snapshot_files(
+                    df_valuations,
                     resource_name="valuations",
                     account_id=ACCOUNT_ID,
+                    fmt=snapshot_fmt,
                 )
+                snapshot_infos["valuations"] = info_val
+                _print_section("Valuations saved")
+                _log_snapshot_paths("valuations", info_val)
             else:
-                maybe_upload_to_s3(
-                    [info_val.get("parquet")],
-                    info_val.get("dt"),
-                    resource_name="valuations",
-                    account_id=ACCOUNT_ID,
-                )
-        else:
-            print("No valuations generated.")
+                print("No valuations generated.")
     except Exception as e:
         print(f"Error computing/saving valuations: {e}")
 
+    maybe_upload_to_s3_multi(snapshot_infos, include_csv=upload_csv)
+
 
 if __name__ == "__main__":
+    # Copy-on-Write (default in pandas 3) lets the chained frame operations in the
+    # job share column data instead of taking defensive copies. Set only for the
+    # CLI run so importing this module doesn't change pandas semantics elsewhere.
+    pd.set_option("mode.copy_on_write", True)
+    # The jobs dashboard parses this run's stdout (e.g. "[ok] Uploaded ->"), so log
+    # plain messages there; third-party loggers stay at WARNING to avoid noise.
+    logging.basicConfig(level=logging.WARNING, format="%(message)s", stream=sys.stdout)
+    logging.getLogger("backend").setLevel(logging.INFO)
     main()
@@ -1,8 +1,16 @@
+import functools
+import json
 import logging
+import os
+import re
+import time
 from datetime import date, datetime
+from pathlib import Path
 from typing import Any, List, Optional, Tuple
 
+import orjson
 import requests
+from requests.adapters import HTTPAdapter
 
 from ..valuation import models as valuation_models
 from .iol_utils import resolve_currency
@@ -12,6 +20,12 @@ TOKEN_ENDPOINT = "/token"
 PORTFOLIO_ENDPOINTS = ["/api/v2/portafolio"]
 BLUE_DOLLAR_URL = "https://dolarapi.com/v1/dolares/blue"
 
+# Access tokens live for minutes; persisting them lets back-to-back runs skip the /token round-trip.
+TOKEN_CACHE_FILE = Path.home() / ".cache" / "fintracker" / "iol_token.json"
+TOKEN_CACHE_FILE_MODE = 0o600
+TOKEN_REUSE_MARGIN_SECONDS = 60
+HTTP_UNAUTHORIZED = 401
+
 # Markets to query
 MARKET_PARAMS = [
     {"pais": "argentina"},
@@ -20,6 +34,19 @@ MARKET_PARAMS = [
 
 LOG = logging.getLogger(__name__)
 
+# One keep-alive session for auth, portfolio, quote and FX calls so each run pays
+# the TLS handshake once per host instead of once per request.
+HTTP_POOL_SIZE = 10
+_SESSION = requests.Session()
+_SESSION.mount("https://", HTTPAdapter(pool_connections=HTTP_POOL_SIZE, pool_maxsize=HTTP_POOL_SIZE))
+
+# Plain unsigned decimals as IOL embeds them in portfolio items (e.g. "1234.5").
+_NUMERIC_RE = re.compile(r"^\d+(?:\.\d+)?$")
+
+
+class IOLUnauthorizedError(RuntimeError):
+    """IOL rejected the bearer token (HTTP 401), e.g. revoked before its stored expiry."""
+
 
 def _safe_text(resp: requests.Response) -> str:
     try:
@@ -28,11 +55,91 @@ def _safe_text(resp: requests.Response) -> str:
         return "<no body>"
 
 
-def get_bearer_tokens(username: str, password: str) -> Tuple[str, str]:
-    data = {"username": username, "password": password, "grant_type": "password"}
-    r = requests.post(BASE_URL + TOKEN_ENDPOINT, data=data, timeout=20)
+def _request_tokens(data: dict) -> dict:
+    r = _SESSION.post(BASE_URL + TOKEN_ENDPOINT, data=data, timeout=20)
     r.raise_for_status()
-    j = r.json()
+    return r.json()
+
+
+def get_bearer_tokens(username: str, password: str) -> Tuple[str, str]:
+    j = _request_tokens({"username": username, "password": password, "grant_type": "password"})
+    return j["access_token"], j.get("refresh_token")
+
+
+def _load_raw_cached_tokens() -> Optional[dict]:
+    try:
+        cached = json.loads(TOKEN_CACHE_FILE.read_text(encoding="utf-8"))
+    except (OSError, ValueError):
+        return None
+    return cached if isinstance(cached, dict) else None
+
+
+def _load_cached_tokens(username: str) -> Optional[dict]:
+    cached = _load_raw_cached_tokens()
+    if cached is None or cached.get("username") != username or not cached.get("access_token"):
+        return None
+    return cached
+
+
+def _store_cached_tokens(username: str, token_response: dict) -> None:
+    try:
+        expires_in = float(token_response.get("expires_in") or 0)
+    except (TypeError, ValueError):
+        expires_in = 0.0
+    payload = {
+        "username": username,
+        "access_token": token_response["access_token"],
+        "refresh_token": token_response.get("refresh_token"),
+        "expires_at": time.time() + expires_in,
+    }
+    try:
+        TOKEN_CACHE_FILE.parent.mkdir(parents=True, exist_ok=True)
+        fd = os.open(TOKEN_CACHE_FILE, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, TOKEN_CACHE_FILE_MODE)
+        with os.fdopen(fd, "w", encoding="utf-8") as fh:
+            json.dump(payload, fh)
+    except OSError as exc:
+        LOG.warning("Unable to cache IOL token at %s: %s", TOKEN_CACHE_FILE, exc)
+
+
+def _clear_cached_tokens(access_token: str) -> None:
+    """Drop the on-disk cache entry if it still holds the rejected access token."""
+    cached = _load_raw_cached_tokens()
+    if cached is None or cached.get("access_token") != access_token:
+        return
+    try:
+        TOKEN_CACHE_FILE.unlink()
+    except OSError as exc:
+        LOG.warning("Unable to clear IOL token cache at %s: %s", TOKEN_CACHE_FILE, exc)
+
+
+def get_cached_bearer_tokens(username: str, password: str) -> Tuple[str, Optional[str]]:
+    """Return IOL tokens, reusing the on-disk cache while the access token is still valid.
+
+    Falls back to the refresh_token grant when the access token expired, and to a full
+    password login when there is no usable refresh token.
+    """
+    cached = _load_cached_tokens(username)
+    if cached:
+        try:
+            expires_at = float(cached.get("expires_at") or 0)
+        except (TypeError, ValueError) as exc:
+            LOG.info("Ignoring corrupted IOL token cache: %s", exc)
+            _clear_cached_tokens(cached["access_token"])
+            cached = None
+    if cached:
+        if expires_at - time.time() > TOKEN_REUSE_MARGIN_SECONDS:
+            return cached["access_token"], cached.get("refresh_token")
+        refresh_token = cached.get("refresh_token")
+        if refresh_token:
+            try:
+                j = _request_tokens({"refresh_token": refresh_token, "grant_type": "refresh_token"})
+                _store_cached_tokens(username, j)
+                return j["access_token"], j.get("refresh_token")
+            except (requests.RequestException, KeyError, ValueError) as exc:
+                LOG.info("IOL token refresh failed; re-authenticating: %s", exc)
+
+    j = _request_tokens({"username": username, "password": password, "grant_type": "password"})
+    _store_cached_tokens(username, j)
     return j["access_token"], j.get("refresh_token")
 
 
@@ -50,9 +157,12 @@ def get_positions(access_token: str) -> List[dict]:
         for params in MARKET_PARAMS:
             market = params.get("pais") or "desconocido"
             try:
-                r = requests.get(url, headers=headers, params=params, timeout=20)
+                r = _SESSION.get(url, headers=headers, params=params, timeout=20)
+                if r.status_code == HTTP_UNAUTHORIZED:
+                    _clear_cached_tokens(access_token)
+                    raise IOLUnauthorizedError(f"IOL rejected the access token at {url}: {_safe_text(r)}")
                 if r.status_code == 200:
-                    data = r.json()
+                    data = orjson.loads(r.content)
                     items = []
                     if isinstance(data, dict):
                         if isinstance(data.get("tenencias"), list):
@@ -72,7 +182,8 @@ def get_positions(access_token: str) -> List[dict]:
                         collected.append(it)
                 else:
                     last_err = f"HTTP {r.status_code} at {url} params={params} body={_safe_text(r)}"
-            except requests.RequestException as e:
+            # orjson errors are not RequestExceptions (unlike r.json()), so catch both
+            except (requests.RequestException, orjson.JSONDecodeError) as e:
                 last_err = f"RequestException at {url} params={params}: {e}"
 
     if not collected:
@@ -100,6 +211,8 @@ def _extract_symbol_and_market(it: dict) -> Optional[tuple]:
     return symbol, market, instr_type
 
 
+# Instrument types repeat across positions, so memoize the heuristic.
+@functools.lru_cache(maxsize=128)
 def _guess_panel(instr_type: Optional[str]) -> str:
     """Very small heuristic to pick a panel string for the IOL Cotizaciones endpoint."""
     if not instr_type:
@@ -132,19 +245,27 @@ def _extract_price_from_quote(q: dict) -> Optional[tuple]:
     return None
 
 
-def get_price_for_symbol(symbol: str, market: str, panel: str, access_token: str) -> Optional[valuation_models.Price]:
+def get_price_for_symbol(
+    symbol: str,
+    market: str,
+    panel: str,
+    access_token: str,
+    asof_dt: Optional[date] = None,
+    asof_ts: Optional[datetime] = None,
+) -> Optional[valuation_models.Price]:
     """Fetch a single quote from IOL and return a validated Price model or None if not found.
 
     This keeps behavior simple: build the Cotizaciones URL, GET it, and parse a best-effort price.
+    Batch callers can pass asof_dt/asof_ts so every quote of a run shares one timestamp.
     """
     url = f"{BASE_URL}/api/v2/Cotizaciones/{market}/{symbol}/{panel}"
     headers = {"Authorization": f"Bearer {access_token}"}
     try:
-        r = requests.get(url, headers=headers, timeout=15)
+        r = _SESSION.get(url, headers=headers, timeout=15)
         if r.status_code != 200:
             LOG.debug("IOL cotizacion miss: %s -> %s (status=%s) body=%s", market, symbol, r.status_code, _safe_text(r))
             return None
-        j = r.json()
+        j = orjson.loads(r.content)
         # The response format may vary; try to find an object with price info
         maybe = None
         if isinstance(j, dict):
@@ -164,8 +285,8 @@ def get_price_for_symbol(symbol: str, market: str, panel: str, access_token: str
         price_value, currency = res
 
         p = valuation_models.Price(
-            asof_dt=date.today(),
-            asof_ts=datetime.utcnow(),
+            asof_dt=asof_dt or date.today(),
+            asof_ts=asof_ts or datetime.utcnow(),
             symbol=symbol,
             price_type="last",
             price=price_value,
@@ -175,7 +296,7 @@ def get_price_for_symbol(symbol: str, market: str, panel: str, access_token: str
             quality_score=100,
         )
         return p
-    except requests.RequestException as e:
+    except (requests.RequestException, orjson.JSONDecodeError) as e:
         LOG.debug("IOL request error for %s/%s/%s: %s", market, symbol, panel, e)
         return None
 
@@ -190,6 +311,9 @@ def get_prices_for_positions(items: List[dict], access_token: str) -> List[valua
     - Return a list of `valuation.models.Price` objects for successful fetches.
     """
     out: List[valuation_models.Price] = []
+    # one timestamp per snapshot run instead of one per position
+    asof_dt = date.today()
+    asof_ts = datetime.utcnow()
     for it in items:
         try:
             res = _extract_symbol_and_market(it)
@@ -201,30 +325,30 @@ def get_prices_for_positions(items: List[dict], access_token: str) -> List[valua
             # quick skip if the position already has a price
             for fld in ("ultimoPrecio", "precio", "ultimo", "last"):
                 raw_value = it.get(fld)
-                if isinstance(raw_value, (int, float)) or (isinstance(raw_value, str) and raw_value.replace('.', '', 1).isdigit()):
+                if raw_value is None:
+                    continue
+                if isinstance(raw_value, (int, float)) or (isinstance(raw_value, str) and _NUMERIC_RE.match(raw_value)):
                     # We already have a price; build a Price model from it instead of fetching
-                    try:
-                        price_val = float(raw_value)
-                    except Exception:
-                        price_val = None
-                    if price_val is not None:
-                        p = valuation_models.Price(
-                            asof_dt=date.today(),
-                            asof_ts=datetime.utcnow(),
-                            symbol=symbol,
-                            price_type="last",
-                            price=price_val,
-                            currency=currency_hint or "ARS",
-                            venue=market,
-                            source="iol",
-                            quality_score=100,
-                        )
-                        out.append(p)
-                        break
+                    p = valuation_models.Price(
+                        asof_dt=asof_dt,
+                        asof_ts=asof_ts,
+                        symbol=symbol,
+                        price_type="last",
+                        price=float(raw_value),
+                        currency=currency_hint or "ARS",
+                        venue=market,
+                        source="iol",
+                        quality_score=100,
+                    )
+                    out.append(p)
+                    # first usable field wins; the for/else below only fetches when none matched
+                    break
 
             else:
                 panel = _guess_panel(instr_type)
-                p = get_price_for_symbol(symbol, market or "argentina", panel, access_token)
+                p = get_price_for_symbol(
+                    symbol, market or "argentina", panel, access_token, asof_dt=asof_dt, asof_ts=asof_ts
+                )
                 if p:
                     if not p.currency:
                         p = p.model_copy(update={"currency": currency_hint or "ARS"})
@@ -238,7 +362,7 @@ def get_fx_rates() -> List[valuation_models.FXRate]:
     """Fetch FX rates (currently the blue dollar) and return validated models."""
 
     try:
-        resp = requests.get(BLUE_DOLLAR_URL, timeout=15)
+        resp = _SESSION.get(BLUE_DOLLAR_URL, timeout=15)
         resp.raise_for_status()
         payload = resp.json()
     except requests.RequestException as exc:
@@ -3,6 +3,20 @@ from .config import ACCOUNT_ID
 from .iol_utils import resolve_currency
 
 
+def _is_truthy(values: pd.Series) -> pd.Series:
+    # NaN stands for a missing key after json_normalize, so it counts as falsy like None
+    return values.notna() & values.ne(0) & values.ne("")
+
+
+def _or_chain(raw: pd.DataFrame, *columns: str) -> pd.Series:
+    """Vectorized `it.get(a) or it.get(b) or ...` over flattened payload columns."""
+    result = None
+    for column in columns:
+        values = raw[column].astype(object) if column in raw else pd.Series(None, index=raw.index, dtype=object)
+        result = values if result is None else result.where(_is_truthy(result), values)
+    return result
+
+
 def extract_positions_as_df(items) -> pd.DataFrame:
     """
     Normalize to: symbol, description, quantity, currency, price, valuation, instrument_type, market.
@@ -11,62 +25,39 @@ def extract_positions_as_df(items) -> pd.DataFrame:
     if not isinstance(items, list):
         return pd.DataFrame()
 
-    rows = []
-    for it in items:
-        if not isinstance(it, dict):
-            continue
-
-        market = it.get("_market")
+    records = [it for it in items if isinstance(it, dict)]
+    if not records:
+        return pd.DataFrame()
 
-        # A) Schema with nested 'titulo'
-        titulo = it.get("titulo")
-        if isinstance(titulo, dict):
-            symbol = titulo.get("simbolo")
-            description = titulo.get("descripcion")
-            currency = resolve_currency(it)
-            instr_type = titulo.get("tipo") or it.get("tipoInstrumento")
-            qty = it.get("cantidad") or it.get("cantidadNominal")
-            price = it.get("ultimoPrecio") or it.get("precio")
-            valuation = (
-                it.get("valorizado")
-                or it.get("valuacion")
-                or (qty and price and qty * price)
-            )
-        else:
-            # B) Flat schema
-            symbol = it.get("simbolo") or it.get("ticker") or it.get("codigo")
-            description = it.get("descripcion")
-            currency = resolve_currency(it)
-            instr_type = it.get("tipoInstrumento") or it.get("instrumento") or it.get("tipo")
-            qty = it.get("cantidad") or it.get("cantidadNominal")
-            price = it.get("ultimoPrecio") or it.get("precio")
-            valuation = (
-                it.get("valorizado")
-                or it.get("valuacion")
-                or (qty and price and qty * price)
-            )
+    raw = pd.json_normalize(records, sep=".")
+    # A) schema with nested 'titulo' vs B) flat schema
+    nested = pd.Series([isinstance(it.get("titulo"), dict) for it in records], index=raw.index)
 
-        # Only include rows with a symbol and a non-zero quantity
-        try:
-            has_qty = qty is not None and float(qty) != 0.0
-        except Exception:
-            has_qty = False
+    symbol = _or_chain(raw, "titulo.simbolo").where(nested, _or_chain(raw, "simbolo", "ticker", "codigo"))
+    description = _or_chain(raw, "titulo.descripcion").where(nested, _or_chain(raw, "descripcion"))
+    instr_type = _or_chain(raw, "titulo.tipo", "tipoInstrumento").where(
+        nested, _or_chain(raw, "tipoInstrumento", "instrumento", "tipo")
+    )
+    quantity = pd.to_numeric(_or_chain(raw, "cantidad", "cantidadNominal"), errors="coerce").astype(float)
+    price = pd.to_numeric(_or_chain(raw, "ultimoPrecio", "precio"), errors="coerce").astype(float)
+    valuation = pd.to_numeric(_or_chain(raw, "valorizado", "valuacion"), errors="coerce").astype(float)
+    valuation = valuation.where(_is_truthy(valuation), quantity * price)
 
-        if symbol and has_qty:
-            rows.append({
-                "symbol": symbol,
-                "description": description,
-                "quantity": float(qty),
-                "currency": currency,
-                "price": float(price) if price is not None else None,
-                "valuation": float(valuation) if valuation is not None else None,
-                "instrument_type": instr_type,
-                "market": market,
-                "source": "iol",
-                "account_id": ACCOUNT_ID,
-            })
+    df = pd.DataFrame({
+        "symbol": symbol,
+        "description": description,
+        "quantity": quantity,
+        "currency": [resolve_currency(it) for it in records],
+        "price": price,
+        "valuation": valuation,
+        "instrument_type": instr_type,
+        "market": _or_chain(raw, "_market"),
+        "source": "iol",
+        "account_id": ACCOUNT_ID,
+    })
 
-    df = pd.DataFrame(rows)
+    # Only include rows with a symbol and a non-zero quantity
+    df = df[_is_truthy(df["symbol"]) & df["quantity"].notna() & df["quantity"].ne(0)]
     if df.empty:
         return df
 
@@ -1,5 +1,6 @@
 from __future__ import annotations
 
+import functools
 import unicodedata
 from typing import Optional, Any
 
@@ -29,6 +30,8 @@ _CURRENCY_ALIASES = {
 }
 
 
+# Payloads repeat a handful of currency labels, so memoize the unicode normalization.
+@functools.lru_cache(maxsize=256)
 def _normalize_currency(value: str) -> str:
     if not value:
         return value
@@ -2,13 +2,19 @@
 
 from __future__ import annotations
 
-import json
 from pathlib import Path
 from typing import List, Optional, TypedDict
 
+import orjson
+
 from .config import ACCOUNT_ID, SANTANDER_HOLDINGS_FILE
 
 
+_DEFAULT_CURRENCY = "ARS"
+_DEFAULT_MARKET = "santander"
+_DEFAULT_SOURCE = "santander"
+
+
 class SantanderHolding(TypedDict):
     fund_id: str
     symbol: str
@@ -20,6 +26,12 @@ class SantanderHolding(TypedDict):
     display_name: Optional[str]
 
 
+def _text_or_default(value, default: str) -> str:
+    if not value:
+        return default
+    return value if isinstance(value, str) else str(value)
+
+
 def _normalize_entry(entry: dict) -> Optional[SantanderHolding]:
     fund_id_raw = entry.get("fund_id") or entry.get("id")
     if fund_id_raw is None:
@@ -43,10 +55,10 @@ def _normalize_entry(entry: dict) -> Optional[SantanderHolding]:
         fund_id=fund_id,
         symbol=symbol,
         quantity=quantity,
-        account_id=str(entry.get("account_id") or ACCOUNT_ID),
-        currency=str(entry.get("currency") or "ARS"),
-        market=str(entry.get("market") or "santander"),
-        source=str(entry.get("source") or "santander"),
+        account_id=_text_or_default(entry.get("account_id"), str(ACCOUNT_ID)),
+        currency=_text_or_default(entry.get("currency"), _DEFAULT_CURRENCY),
+        market=_text_or_default(entry.get("market"), _DEFAULT_MARKET),
+        source=_text_or_default(entry.get("source"), _DEFAULT_SOURCE),
         display_name=str(display_name).strip() if display_name else None,
     )
 
@@ -59,17 +71,17 @@ def load_holdings(path: Optional[str] = None) -> List[SantanderHolding]:
         return []
 
     try:
-        raw_text = file_path.read_text(encoding="utf-8").strip()
+        raw_bytes = file_path.read_bytes()
     except OSError as exc:
         print(f"[warn] Unable to read {file_path}: {exc}")
         return []
 
-    if not raw_text:
+    if not raw_bytes.strip():
         return []
 
     try:
-        payload = json.loads(raw_text)
-    except json.JSONDecodeError as exc:
+        payload = orjson.loads(raw_bytes)
+    except orjson.JSONDecodeError as exc:
         print(f"[warn] Invalid JSON in {file_path}: {exc}")
         return []
 
@@ -89,4 +101,3 @@ def load_holdings(path: Optional[str] = None) -> List[SantanderHolding]:
             holdings.append(normalized)
 
     return holdings
-
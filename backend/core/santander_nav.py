@@ -2,9 +2,12 @@
 
 from __future__ import annotations
 
+import random
 import uuid
+from concurrent.futures import ThreadPoolExecutor
 from typing import Dict, Iterable, List, TypedDict
 
+import orjson
 import requests
 
 LANDING_URL = "https://www.santander.com.ar/personas/inversiones/informacion-fondos"
@@ -25,6 +28,12 @@ API_HEADERS = {
 CONNECT_TIMEOUT_SECONDS = 5
 READ_TIMEOUT_SECONDS = 30
 REQUEST_TIMEOUT = (CONNECT_TIMEOUT_SECONDS, READ_TIMEOUT_SECONDS)
+MAX_CONCURRENT_FUND_REQUESTS = 4
+CORRELATION_ID_BITS = 128
+
+# Correlation ids only need to be unique, not unpredictable, so draw them from
+# one OS-seeded generator instead of hitting the OS CSPRNG for every request.
+_CORRELATION_RNG = random.Random()
 
 
 class FundShareValue(TypedDict):
@@ -38,10 +47,13 @@ def build_session() -> requests.Session:
     return requests.Session()
 
 
+# Shared across fetch_share_values calls so long-lived processes keep their pooled connections.
+_SESSION = build_session()
+
+
 def _api_headers() -> Dict[str, str]:
-    headers = dict(API_HEADERS)
-    headers["x-san-correlationid"] = str(uuid.uuid4())
-    return headers
+    correlation_id = uuid.UUID(int=_CORRELATION_RNG.getrandbits(CORRELATION_ID_BITS), version=4)
+    return {**API_HEADERS, "x-san-correlationid": str(correlation_id)}
 
 
 def fetch_share_value(session: requests.Session, fund_id: str) -> FundShareValue:
@@ -63,7 +75,7 @@ def fetch_share_value(session: requests.Session, fund_id: str) -> FundShareValue
     except requests.RequestException as exc:
         raise RuntimeError(f"Failed to fetch fund {fund_id}: {exc}") from exc
 
-    payload = resp.json()
+    payload = orjson.loads(resp.content)
     data = payload.get("data") or {}
     share_value = data.get("currentShareValue")
     share_date = data.get("currentShareValueDate") or ""
@@ -80,5 +92,6 @@ def fetch_share_value(session: requests.Session, fund_id: str) -> FundShareValue
 
 
 def fetch_share_values(fund_ids: Iterable[str]) -> List[FundShareValue]:
-    session = build_session()
-    return [fetch_share_value(session, f) for f in fund_ids]
+    # Fund requests are independent; fan them out over the one pooled session.
+    with ThreadPoolExecutor(max_workers=MAX_CONCURRENT_FUND_REQUESTS) as executor:
+        return list(executor.map(lambda fund_id: fetch_share_value(_SESSION, fund_id), fund_ids))
@@ -60,6 +60,7 @@ class Settings:
     OUTPUT_DIR: str
     S3_BUCKET: str | None
     S3_PREFIX: str
+    EMIT_CSV: bool
 
     IOL_USERNAME: str | None
     IOL_PASSWORD: str | None
@@ -136,6 +137,7 @@ def load_settings() -> Settings:
         OUTPUT_DIR=os.getenv("SNAPSHOTS_LOCAL_DIR", "data/positions"),
         S3_BUCKET=os.getenv("SNAPSHOTS_S3_BUCKET"),
         S3_PREFIX=os.getenv("SNAPSHOTS_S3_PREFIX", "positions/"),
+        EMIT_CSV=_env_as_bool(os.getenv("SNAPSHOTS_EMIT_CSV")),
         IOL_USERNAME=os.getenv("IOL_USERNAME"),
         IOL_PASSWORD=os.getenv("IOL_PASSWORD"),
         PPI_PUBLIC_API_KEY=os.getenv("PPI_PUBLIC_API_KEY"),
@@ -5,6 +5,8 @@ from typing import Any, Callable
 
 import pandas as pd
 
+from backend.core.iol_client import IOLUnauthorizedError
+
 from .models import SourcePositions
 
 
@@ -64,7 +66,14 @@ def load_positions(
         return SourcePositions(df=pd.DataFrame(columns=position_columns))
 
     access_token, _ = get_bearer_tokens(username, password)
-    raw_items = get_positions(access_token)
+    try:
+        raw_items = get_positions(access_token)
+    except IOLUnauthorizedError as exc:
+        # get_positions already dropped the rejected token from the cache, so this
+        # logs in again with the password grant; retry only once.
+        print(f"IOL rejected the cached token; logging in again: {exc}")
+        access_token, _ = get_bearer_tokens(username, password)
+        raw_items = get_positions(access_token)
     iol_df = extract_positions_as_df(raw_items)
     if not iol_df.empty:
         iol_df["account_id"] = account_id
@@ -1,15 +1,43 @@
 from __future__ import annotations
 
+import functools
+import logging
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timezone
 from pathlib import Path
-from typing import Optional, Sequence
+from typing import Any, Dict, Optional, Sequence
 import os
 
+import pyarrow as pa
+import pyarrow.parquet as pq
+from pyarrow import feather
+
 from . import config
 from .config import Settings
 
+LOG = logging.getLogger(__name__)
+
 _BUCKET_NOTICE_EMITTED = False
 _CREDENTIAL_NOTICE_EMITTED = False
+# One S3 client per credential set, reused across calls so its connection pool stays warm
+_S3_CLIENTS: Dict[tuple, Any] = {}
+MAX_UPLOAD_WORKERS = 8
+# Files above the threshold go up as concurrent multipart parts
+MULTIPART_CHUNK_BYTES = 8 * 1024 * 1024
+MULTIPART_MAX_CONCURRENCY = 10
+# Above botocore's default of 10 so concurrent uploads/parts reuse pooled connections
+# instead of opening a new TLS connection per extra thread.
+S3_MAX_POOL_CONNECTIONS = 32
+S3_MAX_ATTEMPTS = 5
+SNAPSHOT_TS_COLUMN = "snapshot_ts"
+SNAPSHOT_FORMATS = ("parquet", "feather", "parquet+feather", "auto")
+# With fmt="auto", frames smaller than this are written as Feather: for tiny
+# tables Parquet's footer/statistics encoding dominates the write time.
+SMALL_SNAPSHOT_MAX_ROWS = 1000
+# pyarrow defaults zstd to level 1; 3 compresses noticeably better at similar speed
+PARQUET_ZSTD_LEVEL = 3
+# 10 significant digits is plenty for prices/quantities and keeps CSV output compact
+CSV_FLOAT_FORMAT = "%.10g"
 
 
 # --------------------------- helpers ---------------------------
@@ -54,45 +82,217 @@ def save_snapshot_files(
     source: Optional[str] = None,
     account_id: Optional[str] = None,
     settings: Settings | None = None,
+    snapshot_ts: datetime | None = None,
+    write_csv: bool | None = None,
+    fmt: str = "parquet",
 ) -> dict:
     """
-    Save CSV (always) and Parquet (best-effort) under:
+    Save Parquet, or Feather/Arrow IPC (LZ4) when fmt="feather", plus CSV only
+    when write_csv is set (defaults to SNAPSHOTS_EMIT_CSV). fmt="parquet+feather"
+    writes both: Parquet to archive and Feather for fast local read-back.
+    fmt="auto" picks Feather for small frames and Parquet otherwise. Files go under:
       {OUTPUT_DIR}/{resource}/dt=YYYY-MM-DD/[source=...]/[account=...]/
 
-    Returns {"csv": str|None, "parquet": str|None, "dt": "YYYY-MM-DD"}.
+    If the columnar write fails, a CSV is written instead so the snapshot is not lost.
+    Returns {"csv": str|None, "parquet": str|None, "feather": str|None, "dt": "YYYY-MM-DD",
+    "parquet_bytes": bytes|None, "source": str|None, "account_id": str|None}; the
+    serialized Parquet is kept so S3 uploads can send it from memory instead of
+    re-reading the file, and source/account_id let uploads rebuild the partition.
     """
-    ts = datetime.now(timezone.utc)
-    dt = ts.strftime("%Y-%m-%d")
+    if fmt not in SNAPSHOT_FORMATS:
+        raise ValueError(f"Unsupported snapshot format: {fmt}")
+    if write_csv is None:
+        write_csv = settings.EMIT_CSV if settings is not None else config.EMIT_CSV
+    if fmt == "auto":
+        fmt = "feather" if len(df) < SMALL_SNAPSHOT_MAX_ROWS else "parquet"
+    ts = snapshot_ts or datetime.now(timezone.utc)
+    # format once; the partition date and file stamp are slices of the ISO string
+    ts_iso = ts.isoformat(timespec="seconds").replace("+00:00", "Z")
+    dt = ts_iso[:10]
 
     output_dir = settings.OUTPUT_DIR if settings is not None else config.OUTPUT_DIR
-    out_dir = Path(output_dir)
-    for part in _parts_for(resource_name, dt, source, account_id, settings):
-        out_dir /= part
+    out_dir = Path(output_dir, *_parts_for(resource_name, dt, source, account_id, settings))
     out_dir.mkdir(parents=True, exist_ok=True)
 
-    stamp = ts.strftime("%H%M%S")
+    stamp = ts_iso[11:19].replace(":", "")
     base = f"{resource_name}_{dt}_{stamp}"
     csv_path = out_dir / f"{base}.csv"
     pq_path = out_dir / f"{base}.parquet"
-
-    # attach timestamp column
-    df_out = df.copy()
-    df_out["snapshot_ts"] = ts.isoformat(timespec="seconds").replace("+00:00", "Z")
-
-    df_out.to_csv(csv_path, index=False)
+    feather_path = out_dir / f"{base}.feather"
 
     parquet_path_str: Optional[str] = None
+    parquet_bytes: Optional[bytes] = None
+    feather_path_str: Optional[str] = None
     try:
-        df_out.to_parquet(pq_path, index=False)  # requires pyarrow or fastparquet
-        parquet_path_str = str(pq_path)
+        # Attach the timestamp on the Arrow table so the caller's frame is never
+        # copied; the columns are converted once and written as-is.
+        converted = pa.Table.from_pandas(df, preserve_index=False)
+        if SNAPSHOT_TS_COLUMN in converted.column_names:
+            converted = converted.drop_columns([SNAPSHOT_TS_COLUMN])
+        table = converted.append_column(SNAPSHOT_TS_COLUMN, pa.repeat(ts_iso, converted.num_rows))
+        if fmt in ("feather", "parquet+feather"):
+            feather.write_feather(table, feather_path, compression="lz4")
+            feather_path_str = str(feather_path)
+        if fmt in ("parquet", "parquet+feather"):
+            # snapshots are small: a single row group keeps one footer entry per column
+            sink = pa.BufferOutputStream()
+            pq.write_table(
+                table,
+                sink,
+                compression="zstd",
+                compression_level=PARQUET_ZSTD_LEVEL,
+                row_group_size=max(table.num_rows, 1),
+            )
+            parquet_bytes = sink.getvalue().to_pybytes()
+            pq_path.write_bytes(parquet_bytes)
+            parquet_path_str = str(pq_path)
     except Exception as e:
-        print(f"[warn] Parquet save failed; keeping CSV only: {e}")
-
-    return {"csv": str(csv_path), "parquet": parquet_path_str, "dt": dt}
+        LOG.warning("[warn] %s save failed; falling back to CSV: %s", fmt.capitalize(), e)
+        write_csv = True
+
+    csv_path_str: Optional[str] = None
+    if write_csv:
+        # pandas keeps the CSVs in their established layout (unquoted strings,
+        # the snapshot_ts ISO string) and honours CSV_FLOAT_FORMAT
+        df.assign(**{SNAPSHOT_TS_COLUMN: ts_iso}).to_csv(
+            csv_path, index=False, float_format=CSV_FLOAT_FORMAT
+        )
+        csv_path_str = str(csv_path)
+
+    return {
+        "csv": csv_path_str,
+        "parquet": parquet_path_str,
+        "feather": feather_path_str,
+        "dt": dt,
+        "parquet_bytes": parquet_bytes,
+        "source": source,
+        "account_id": account_id,
+    }
 
 
 # --------------------------- S3 upload ---------------------------
 
+def _s3_client(settings: Settings | None = None):
+    """Return (s3_client, bucket, prefix), or None when uploads are disabled/unconfigured."""
+    global _BUCKET_NOTICE_EMITTED, _CREDENTIAL_NOTICE_EMITTED
+
+    s3_bucket = settings.S3_BUCKET if settings is not None else config.S3_BUCKET
+    s3_prefix = settings.S3_PREFIX if settings is not None else config.S3_PREFIX
+
+    if not s3_bucket:
+        if not _BUCKET_NOTICE_EMITTED:
+            LOG.info("[info] S3 bucket not set; skipping upload.")
+            _BUCKET_NOTICE_EMITTED = True
+        return None
+
+    # Allow explicit credentials via env variables for local runs or CI.
+    # Respect standard AWS env vars (AWS_ACCESS_KEY_ID / AWS_SECRET_ACCESS_KEY / AWS_SESSION_TOKEN / AWS_DEFAULT_REGION)
+    aws_key = os.getenv("AWS_ACCESS_KEY_ID") or os.getenv("SNAPSHOTS_AWS_ACCESS_KEY_ID")
+    aws_secret = os.getenv("AWS_SECRET_ACCESS_KEY") or os.getenv("SNAPSHOTS_AWS_SECRET_ACCESS_KEY")
+    aws_token = os.getenv("AWS_SESSION_TOKEN")
+    aws_region = os.getenv("AWS_DEFAULT_REGION") or os.getenv("AWS_REGION")
+
+    cache_key = (aws_key, aws_secret, aws_token, aws_region)
+    cached_client = _S3_CLIENTS.get(cache_key)
+    if cached_client is not None:
+        return cached_client, s3_bucket, s3_prefix
+
+    import boto3  # lazy import
+
+    if aws_key and aws_secret:
+        session = boto3.Session(
+            aws_access_key_id=aws_key,
+            aws_secret_access_key=aws_secret,
+            aws_session_token=aws_token,
+            region_name=aws_region,
+        )
+    else:
+        # Let boto3 fall back to its normal credential resolution chain
+        session = boto3.Session()
+
+    credentials = session.get_credentials()
+    if credentials is None or not credentials.access_key:
+        if not _CREDENTIAL_NOTICE_EMITTED:
+            LOG.info("[info] AWS credentials not configured; skipping S3 upload.")
+            _CREDENTIAL_NOTICE_EMITTED = True
+        return None
+
+    from botocore.config import Config  # lazy import
+
+    client_config = Config(
+        max_pool_connections=S3_MAX_POOL_CONNECTIONS,
+        retries={"max_attempts": S3_MAX_ATTEMPTS, "mode": "adaptive"},
+        tcp_keepalive=True,
+    )
+    s3 = session.client("s3", config=client_config)
+    _S3_CLIENTS[cache_key] = s3
+    return s3, s3_bucket, s3_prefix
+
+
+def _key_prefix(
+    s3_prefix: str,
+    resource_name: str,
+    dt: str,
+    source: Optional[str],
+    account_id: Optional[str],
+    settings: Settings | None,
+) -> str:
+    key_prefix = "/".join(_parts_for(resource_name, dt, source, account_id, settings))
+    if s3_prefix:
+        key_prefix = f"{s3_prefix.rstrip('/')}/{key_prefix}"
+    return key_prefix
+
+
+@functools.lru_cache(maxsize=1)
+def _transfer_config():
+    from boto3.s3.transfer import TransferConfig  # lazy import
+
+    return TransferConfig(
+        multipart_threshold=MULTIPART_CHUNK_BYTES,
+        multipart_chunksize=MULTIPART_CHUNK_BYTES,
+        max_concurrency=MULTIPART_MAX_CONCURRENCY,
+        use_threads=True,
+    )
+
+
+def _upload_file(s3, s3_bucket: str, local_path: Path, key: str, body: Optional[bytes] = None) -> None:
+    if body is None and local_path.stat().st_size < MULTIPART_CHUNK_BYTES:
+        # small files fit in one PUT: skip the TransferManager setup per file
+        body = local_path.read_bytes()
+    if body is not None:
+        s3.put_object(Bucket=s3_bucket, Key=key, Body=body)
+    else:
+        s3.upload_file(str(local_path), s3_bucket, key, Config=_transfer_config())
+    LOG.info("[ok] Uploaded -> s3://%s/%s", s3_bucket, key)
+
+
+def _upload_all(s3, s3_bucket: str, uploads: Sequence[tuple[Path, str, Optional[bytes]]]) -> None:
+    if not uploads:
+        return
+    # boto3 clients are thread-safe, so the worker threads share one connection pool.
+    with ThreadPoolExecutor(max_workers=min(MAX_UPLOAD_WORKERS, len(uploads))) as executor:
+        futures = [executor.submit(_upload_file, s3, s3_bucket, pth, key, body) for pth, key, body in uploads]
+        for future in futures:
+            future.result()
+
+
+def _report_upload_error(e: Exception) -> None:
+    # Try to provide a clearer hint for missing credentials (botocore raises NoCredentialsError)
+    try:
+        from botocore.exceptions import NoCredentialsError
+
+        if isinstance(e, NoCredentialsError) or "Unable to locate credentials" in str(e):
+            LOG.error("[error] S3 upload failed: Unable to locate credentials.\n"
+                      "Set AWS_ACCESS_KEY_ID and AWS_SECRET_ACCESS_KEY (or run 'aws configure'),\n"
+                      "or provide credentials via IAM role / AWS_PROFILE in the environment.")
+            return
+    except Exception:
+        # ignore import/check failures and fall back to generic message
+        pass
+
+    LOG.error("[error] S3 upload failed: %s", e)
+
+
 def maybe_upload_to_s3(
     paths: Sequence[str],
     dt: str,
@@ -102,73 +302,54 @@ def maybe_upload_to_s3(
     settings: Settings | None = None,
 ) -> None:
     """
-    If S3_BUCKET is set, upload given local file paths to:
+    If S3_BUCKET is set, upload given local file paths (concurrently) to:
       s3://{S3_BUCKET}/{S3_PREFIX}{resource}/dt=.../[...]/filename
     """
-    global _BUCKET_NOTICE_EMITTED, _CREDENTIAL_NOTICE_EMITTED
+    try:
+        client = _s3_client(settings)
+        if client is None:
+            return
+        s3, s3_bucket, s3_prefix = client
 
-    s3_bucket = settings.S3_BUCKET if settings is not None else config.S3_BUCKET
-    s3_prefix = settings.S3_PREFIX if settings is not None else config.S3_PREFIX
+        key_prefix = _key_prefix(s3_prefix, resource_name, dt, source, account_id, settings)
+        uploads = [(Path(p), f"{key_prefix}/{Path(p).name}", None) for p in paths if p]
+        _upload_all(s3, s3_bucket, uploads)
 
-    if not s3_bucket:
-        if not _BUCKET_NOTICE_EMITTED:
-            print("[info] S3 bucket not set; skipping upload.")
-            _BUCKET_NOTICE_EMITTED = True
-        return
+    except Exception as e:
+        _report_upload_error(e)
 
+
+def maybe_upload_to_s3_multi(
+    infos: Dict[str, dict],
+    include_csv: bool = False,
+    settings: Settings | None = None,
+) -> None:
+    """
+    Upload {resource_name: save_snapshot_files(...) info} with one S3 client,
+    sending all of them concurrently instead of one resource at a time. Each
+    info carries its own source/account_id, so resources with different
+    partitions share one batch.
+    """
     try:
-        import boto3  # lazy import
-        # Allow explicit credentials via env variables for local runs or CI.
-        # Respect standard AWS env vars (AWS_ACCESS_KEY_ID / AWS_SECRET_ACCESS_KEY / AWS_SESSION_TOKEN / AWS_DEFAULT_REGION)
-        aws_key = os.getenv("AWS_ACCESS_KEY_ID") or os.getenv("SNAPSHOTS_AWS_ACCESS_KEY_ID")
-        aws_secret = os.getenv("AWS_SECRET_ACCESS_KEY") or os.getenv("SNAPSHOTS_AWS_SECRET_ACCESS_KEY")
-        aws_token = os.getenv("AWS_SESSION_TOKEN")
-        aws_region = os.getenv("AWS_DEFAULT_REGION") or os.getenv("AWS_REGION")
-
-        if aws_key and aws_secret:
-            session = boto3.Session(
-                aws_access_key_id=aws_key,
-                aws_secret_access_key=aws_secret,
-                aws_session_token=aws_token,
-                region_name=aws_region,
-            )
-        else:
-            # Let boto3 fall back to its normal credential resolution chain
-            session = boto3.Session()
-
-        credentials = session.get_credentials()
-        if credentials is None or not credentials.access_key:
-            if not _CREDENTIAL_NOTICE_EMITTED:
-                print("[info] AWS credentials not configured; skipping S3 upload.")
-                _CREDENTIAL_NOTICE_EMITTED = True
+        client = _s3_client(settings)
+        if client is None:
             return
+        s3, s3_bucket, s3_prefix = client
 
-        s3 = session.client("s3")
-
-        key_prefix = "/".join(_parts_for(resource_name, dt, source, account_id, settings))
-        if s3_prefix:
-            key_prefix = f"{s3_prefix.rstrip('/')}/{key_prefix}"
+        uploads: list[tuple[Path, str, Optional[bytes]]] = []
+        for resource_name, info in infos.items():
+            key_prefix = _key_prefix(
+                s3_prefix, resource_name, info.get("dt"), info.get("source"), info.get("account_id"), settings
+            )
+            files = [(info.get("parquet"), info.get("parquet_bytes"))]
+            if include_csv:
+                files.insert(0, (info.get("csv"), None))
+            for p, body in files:
+                if p:
+                    pth = Path(p)
+                    uploads.append((pth, f"{key_prefix}/{pth.name}", body))
 
-        for p in paths:
-            if not p:
-                continue
-            pth = Path(p)
-            key = f"{key_prefix}/{pth.name}"
-            s3.upload_file(str(pth), s3_bucket, key)
-            print(f"[ok] Uploaded -> s3://{s3_bucket}/{key}")
+        _upload_all(s3, s3_bucket, uploads)
 
     except Exception as e:
-        # Try to provide a clearer hint for missing credentials (botocore raises NoCredentialsError)
-        try:
-            from botocore.exceptions import NoCredentialsError
-
-            if isinstance(e, NoCredentialsError) or "Unable to locate credentials" in str(e):
-                print("[error] S3 upload failed: Unable to locate credentials.\n"
-                      "Set AWS_ACCESS_KEY_ID and AWS_SECRET_ACCESS_KEY (or run 'aws configure'),\n"
-                      "or provide credentials via IAM role / AWS_PROFILE in the environment.")
-                return
-        except Exception:
-            # ignore import/check failures and fall back to generic message
-            pass
-
-        print(f"[error] S3 upload failed: {e}")
+        _report_upload_error(e)
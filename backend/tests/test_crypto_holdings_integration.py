@@ -38,14 +38,21 @@ def test_crypto_holdings_are_loaded_and_valued(tmp_path: Path):
         Position(
             snapshot_dt=snapshot_dt,
             snapshot_ts=snapshot_ts,
-            account_id=row["account_id"],
-            source=row["source"],
-            market=row["market"],
-            symbol=row["symbol"],
-            quantity=float(row["quantity"]),
-            currency=row["currency"],
+            account_id=account_id,
+            source=source,
+            market=market,
+            symbol=symbol,
+            quantity=quantity,
+            currency=currency,
+        )
+        for account_id, source, market, symbol, quantity, currency in zip(
+            df["account_id"].tolist(),
+            df["source"].tolist(),
+            df["market"].tolist(),
+            df["symbol"].tolist(),
+            df["quantity"].astype("float64").tolist(),
+            df["currency"].tolist(),
         )
-        for row in df.to_dict(orient="records")
     ]
 
     price_models = [
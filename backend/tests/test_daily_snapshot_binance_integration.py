@@ -45,12 +45,12 @@ def test_daily_snapshot_merges_and_prices_binance(monkeypatch):
     dt_str = "2024-01-01"
     saved = {}
 
-    def fake_save_snapshot_files(df, resource_name="positions", source=None, account_id=None):
+    def fake_save_snapshot_files(df, resource_name="positions", source=None, account_id=None, fmt="parquet"):
         saved[resource_name] = df.copy()
         return {"csv": f"/tmp/{resource_name}.csv", "parquet": None, "dt": dt_str}
 
     monkeypatch.setattr(daily_snapshot, "save_snapshot_files", fake_save_snapshot_files)
-    monkeypatch.setattr(daily_snapshot, "maybe_upload_to_s3", lambda *args, **kwargs: None)
+    monkeypatch.setattr(daily_snapshot, "maybe_upload_to_s3_multi", lambda *args, **kwargs: None)
     monkeypatch.setattr(daily_snapshot, "IOL_USERNAME", "user")
     monkeypatch.setattr(daily_snapshot, "IOL_PASSWORD", "pass")
     monkeypatch.setattr(daily_snapshot, "ENABLE_PPI", False)
@@ -64,7 +64,7 @@ def test_daily_snapshot_merges_and_prices_binance(monkeypatch):
     monkeypatch.setattr(iol_transform, "ACCOUNT_ID", "acct-1")
     monkeypatch.setattr(binance_transform, "ACCOUNT_ID", "acct-1")
 
-    monkeypatch.setattr(daily_snapshot, "get_bearer_tokens", lambda u, p: ("token", "refresh"))
+    monkeypatch.setattr(daily_snapshot, "get_cached_bearer_tokens", lambda u, p: ("token", "refresh"))
     monkeypatch.setattr(
         daily_snapshot,
         "get_positions",
@@ -143,7 +143,7 @@ def test_daily_snapshot_merges_and_prices_binance(monkeypatch):
     assert (prices_df["account_id"] == "acct-1").all()
 
     fx_df = saved["fx"]
-    assert any(row["from_ccy"] == "USDT" and row["to_ccy"] == "USD" for _, row in fx_df.iterrows())
+    assert ((fx_df["from_ccy"] == "USDT") & (fx_df["to_ccy"] == "USD")).any()
 
     valuations_df = saved["valuations"]
     btc_val = valuations_df[valuations_df["symbol"] == "BTC"].iloc[0]
@@ -155,7 +155,7 @@ def test_daily_snapshot_values_ppi_without_iol(monkeypatch):
     dt_str = "2024-01-01"
     saved = {}
 
-    def fake_save_snapshot_files(df, resource_name="positions", source=None, account_id=None):
+    def fake_save_snapshot_files(df, resource_name="positions", source=None, account_id=None, fmt="parquet"):
         saved[resource_name] = df.copy()
         return {"csv": f"/tmp/{resource_name}.csv", "parquet": None, "dt": dt_str}
 
@@ -199,7 +199,7 @@ def test_daily_snapshot_values_ppi_without_iol(monkeypatch):
     }
 
     monkeypatch.setattr(daily_snapshot, "save_snapshot_files", fake_save_snapshot_files)
-    monkeypatch.setattr(daily_snapshot, "maybe_upload_to_s3", lambda *args, **kwargs: None)
+    monkeypatch.setattr(daily_snapshot, "maybe_upload_to_s3_multi", lambda *args, **kwargs: None)
     monkeypatch.setattr(daily_snapshot, "IOL_USERNAME", None)
     monkeypatch.setattr(daily_snapshot, "IOL_PASSWORD", None)
     monkeypatch.setattr(daily_snapshot, "ENABLE_PPI", True)
@@ -0,0 +1,160 @@
+from __future__ import annotations
+
+import json
+import time
+
+import pandas as pd
+
+from backend.core import iol_client
+from backend.core.sources import iol as iol_source
+
+
+def test_get_prices_for_positions_uses_embedded_numeric_string_price(monkeypatch):
+    def fail_fetch(*args, **kwargs):
+        raise AssertionError("quote endpoint should not be called")
+
+    monkeypatch.setattr(iol_client, "get_price_for_symbol", fail_fetch)
+    items = [{"simbolo": "GGAL", "ultimoPrecio": "1234.5", "moneda": "peso_Argentino", "_market": "argentina"}]
+
+    prices = iol_client.get_prices_for_positions(items, "token")
+
+    assert len(prices) == 1
+    assert prices[0].symbol == "GGAL"
+    assert prices[0].price == 1234.5
+    assert prices[0].currency == "ARS"
+
+
+def test_get_prices_for_positions_fetches_when_price_is_not_numeric(monkeypatch):
+    fetched = []
+
+    def fake_fetch(symbol, market, panel, access_token, asof_dt=None, asof_ts=None):
+        fetched.append((symbol, market, panel))
+        return None
+
+    monkeypatch.setattr(iol_client, "get_price_for_symbol", fake_fetch)
+    items = [{"simbolo": "AL30", "precio": "n/d", "tipoInstrumento": "Bonos", "_market": "argentina"}]
+
+    prices = iol_client.get_prices_for_positions(items, "token")
+
+    assert prices == []
+    assert fetched == [("AL30", "argentina", "RentaFija")]
+
+
+def test_get_cached_bearer_tokens_reuses_unexpired_token(tmp_path, monkeypatch):
+    cache_file = tmp_path / "iol_token.json"
+    cache_file.write_text(
+        json.dumps({"username": "user", "access_token": "cached", "refresh_token": "r", "expires_at": time.time() + 600}),
+        encoding="utf-8",
+    )
+    monkeypatch.setattr(iol_client, "TOKEN_CACHE_FILE", cache_file)
+
+    def fail_post(*args, **kwargs):
+        raise AssertionError("token endpoint should not be called")
+
+    monkeypatch.setattr(iol_client._SESSION, "post", fail_post)
+
+    assert iol_client.get_cached_bearer_tokens("user", "pass") == ("cached", "r")
+
+
+def test_get_cached_bearer_tokens_refreshes_expired_token(tmp_path, monkeypatch):
+    cache_file = tmp_path / "iol_token.json"
+    cache_file.write_text(
+        json.dumps({"username": "user", "access_token": "old", "refresh_token": "r1", "expires_at": time.time() - 1}),
+        encoding="utf-8",
+    )
+    monkeypatch.setattr(iol_client, "TOKEN_CACHE_FILE", cache_file)
+    posted = []
+
+    class FakeResponse:
+        def raise_for_status(self):
+            return None
+
+        def json(self):
+            return {"access_token": "new", "refresh_token": "r2", "expires_in": 900}
+
+    def fake_post(url, data=None, timeout=None):
+        posted.append(data)
+        return FakeResponse()
+
+    monkeypatch.setattr(iol_client._SESSION, "post", fake_post)
+
+    assert iol_client.get_cached_bearer_tokens("user", "pass") == ("new", "r2")
+    assert posted == [{"refresh_token": "r1", "grant_type": "refresh_token"}]
+    assert json.loads(cache_file.read_text(encoding="utf-8"))["access_token"] == "new"
+
+
+def test_get_cached_bearer_tokens_logs_in_when_cache_is_corrupted(tmp_path, monkeypatch):
+    cache_file = tmp_path / "iol_token.json"
+    cache_file.write_text(
+        json.dumps({"username": "user", "access_token": "old", "refresh_token": "r1", "expires_at": "soon"}),
+        encoding="utf-8",
+    )
+    monkeypatch.setattr(iol_client, "TOKEN_CACHE_FILE", cache_file)
+    posted = []
+
+    class FakeResponse:
+        def raise_for_status(self):
+            return None
+
+        def json(self):
+            return {"access_token": "new", "refresh_token": "r2", "expires_in": 900}
+
+    def fake_post(url, data=None, timeout=None):
+        posted.append(data)
+        return FakeResponse()
+
+    monkeypatch.setattr(iol_client._SESSION, "post", fake_post)
+
+    assert iol_client.get_cached_bearer_tokens("user", "pass") == ("new", "r2")
+    assert posted == [{"username": "user", "password": "pass", "grant_type": "password"}]
+    assert json.loads(cache_file.read_text(encoding="utf-8"))["access_token"] == "new"
+
+
+def test_load_positions_logs_in_again_when_cached_token_is_rejected(tmp_path, monkeypatch):
+    cache_file = tmp_path / "iol_token.json"
+    cache_file.write_text(
+        json.dumps({"username": "user", "access_token": "revoked", "refresh_token": "r1", "expires_at": time.time() + 600}),
+        encoding="utf-8",
+    )
+    monkeypatch.setattr(iol_client, "TOKEN_CACHE_FILE", cache_file)
+    posted = []
+
+    class FakeResponse:
+        def __init__(self, status_code, payload):
+            self.status_code = status_code
+            self.content = json.dumps(payload).encode("utf-8")
+            self.text = self.content.decode("utf-8")
+            self._payload = payload
+
+        def raise_for_status(self):
+            return None
+
+        def json(self):
+            return self._payload
+
+    def fake_get(url, headers=None, params=None, timeout=None):
+        if headers["Authorization"] == "Bearer revoked":
+            return FakeResponse(401, {"message": "Authorization has been denied"})
+        return FakeResponse(200, {"activos": [{"simbolo": "GGAL", "cantidad": 1}]})
+
+    def fake_post(url, data=None, timeout=None):
+        posted.append(data)
+        return FakeResponse(200, {"access_token": "fresh", "refresh_token": "r2", "expires_in": 900})
+
+    monkeypatch.setattr(iol_client._SESSION, "get", fake_get)
+    monkeypatch.setattr(iol_client._SESSION, "post", fake_post)
+
+    result = iol_source.load_positions(
+        username="user",
+        password="pass",
+        account_id="acct-1",
+        position_columns=["symbol"],
+        get_bearer_tokens=iol_client.get_cached_bearer_tokens,
+        get_positions=iol_client.get_positions,
+        extract_positions_as_df=lambda items: pd.DataFrame({"symbol": [it["simbolo"] for it in items]}),
+    )
+
+    assert result.access_token == "fresh"
+    assert [item["simbolo"] for item in result.raw_items] == ["GGAL", "GGAL"]
+    assert [data["grant_type"] for data in posted] == ["password"]
+    assert json.loads(cache_file.read_text(encoding="utf-8"))["access_token"] == "fresh"
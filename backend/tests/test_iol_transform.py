@@ -0,0 +1,47 @@
+from __future__ import annotations
+
+import pandas as pd
+
+from backend.core.iol_transform import extract_positions_as_df
+
+
+def test_extract_positions_as_df_handles_nested_and_flat_items():
+    items = [
+        {
+            "titulo": {"simbolo": "GGAL", "descripcion": "Galicia", "tipo": "ACCIONES", "moneda": "peso_Argentino"},
+            "cantidad": 10,
+            "ultimoPrecio": 100.0,
+            "_market": "argentina",
+        },
+        {
+            "titulo": {"simbolo": "GGAL", "descripcion": "Galicia", "tipo": "ACCIONES", "moneda": "peso_Argentino"},
+            "cantidad": 5,
+            "ultimoPrecio": 100.0,
+            "_market": "argentina",
+        },
+        {"simbolo": "AL30", "tipoInstrumento": "Bonos", "moneda": "ARS", "cantidad": 0, "cantidadNominal": 7, "precio": 50.0, "_market": "argentina"},
+        {"simbolo": "ZERO", "moneda": "ARS", "cantidad": 0},
+        "not-a-dict",
+    ]
+
+    df = extract_positions_as_df(items).set_index("symbol")
+
+    assert list(df.index) == ["AL30", "GGAL"]
+    assert df.loc["GGAL", "quantity"] == 15
+    assert df.loc["GGAL", "valuation"] == 1500
+    assert df.loc["GGAL", "currency"] == "ARS"
+    assert df.loc["AL30", "quantity"] == 7
+    assert df.loc["AL30", "instrument_type"] == "Bonos"
+    assert df.loc["AL30", "valuation"] == 350
+
+
+def test_extract_positions_as_df_row_does_not_depend_on_other_duplicates():
+    unpriced = {"simbolo": "X", "tipoInstrumento": "Bonos", "moneda": "ARS", "cantidad": 3, "_market": "argentina"}
+    other = {"simbolo": "Y", "tipoInstrumento": "Bonos", "moneda": "ARS", "cantidad": 1, "precio": 10.0, "_market": "argentina"}
+
+    unique = extract_positions_as_df([unpriced, other]).set_index("symbol")
+    duplicated = extract_positions_as_df([unpriced, other, other]).set_index("symbol")
+
+    pd.testing.assert_series_equal(unique.loc["X"], duplicated.loc["X"])
+    assert unique.loc["X", "valuation"] == 0.0
+    assert unique.loc["X", "description"] is None
@@ -315,3 +315,17 @@ def test_price_history_adjusts_spy_cedear_ratio_change_and_suppresses_outlier(tm
     assert response.prices[1].outlier_reason is None
     assert all(point.is_known_event for point in response.prices)
     assert response.prices[1].known_event_reason == "SPY CEDEAR ratio changed from 20:1 to 60:1"
+
+
+def test_collect_snapshot_files_keeps_parquet_runs_next_to_feather(tmp_path):
+    dt_dir = tmp_path / "dt=2024-01-01"
+    source_dir = dt_dir / "source=dolarapi_blue_venta"
+    source_dir.mkdir(parents=True)
+    frame = pd.DataFrame([{"from_ccy": "USD", "to_ccy": "ARS", "rate": 1000.0}])
+    frame.to_parquet(source_dir / "fx_2024-01-01_090000.parquet", index=False)
+    frame.to_parquet(source_dir / "fx_2024-01-01_150000.parquet", index=False)
+    frame.to_feather(source_dir / "fx_2024-01-01_150000.feather")
+
+    files = prices_history._collect_snapshot_files(dt_dir, "fx_")
+
+    assert sorted(path.name for path in files) == ["fx_2024-01-01_090000.parquet", "fx_2024-01-01_150000.feather"]
@@ -0,0 +1,25 @@
+from __future__ import annotations
+
+from pathlib import Path
+
+from backend.core import santander_holdings
+
+
+def test_load_holdings_parses_and_normalizes_entries(tmp_path: Path):
+    holdings_file = tmp_path / "santander_holdings.json"
+    holdings_file.write_text(
+        '{"positions": [{"fund_id": "1", "quantity": 10}, {"fund_id": "2", "quantity": 5, "symbol": "fbaa"}]}',
+        encoding="utf-8",
+    )
+
+    holdings = santander_holdings.load_holdings(str(holdings_file))
+
+    assert [h["symbol"] for h in holdings] == ["SANTANDER_1", "FBAA"]
+    assert holdings[0]["quantity"] == 10.0
+
+
+def test_load_holdings_missing_or_blank_file(tmp_path: Path):
+    assert santander_holdings.load_holdings(str(tmp_path / "missing.json")) == []
+    blank = tmp_path / "blank.json"
+    blank.write_text("  \n", encoding="utf-8")
+    assert santander_holdings.load_holdings(str(blank)) == []
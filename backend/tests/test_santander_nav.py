@@ -1,5 +1,7 @@
 from __future__ import annotations
 
+import json
+
 import pytest
 
 from backend.core import santander_nav
@@ -7,14 +9,11 @@ from backend.core import santander_nav
 
 class DummyResponse:
     def __init__(self, json_data):
-        self._json = json_data
+        self.content = json.dumps(json_data).encode("utf-8")
 
     def raise_for_status(self):
         return None
 
-    def json(self):
-        return self._json
-
 
 class DummySession:
     def __init__(self):
@@ -116,3 +115,16 @@ def test_fetch_share_value_reports_timeout_retry_failure(monkeypatch):
         ),
     ):
         santander_nav.fetch_share_value(TimingOutSession(), "99")
+
+
+def test_fetch_share_values_reuses_module_session(monkeypatch):
+    session = DummySession()
+    monkeypatch.setattr(santander_nav, "_SESSION", session)
+
+    santander_nav.fetch_share_values(["1"])
+    results = santander_nav.fetch_share_values(["2", "3"])
+
+    assert [row["fund_id"] for row in results] == ["2", "3"]
+    assert sorted(call["url"] for call in session.calls) == [
+        santander_nav.DETAIL_URL.format(fund_id=fund_id) for fund_id in ("1", "2", "3")
+    ]
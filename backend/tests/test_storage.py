@@ -0,0 +1,121 @@
+from __future__ import annotations
+
+from datetime import datetime, timezone
+from pathlib import Path
+
+import pandas as pd
+
+from backend.core import storage
+
+
+def test_save_snapshot_files_writes_parquet_only_by_default(tmp_path, monkeypatch):
+    monkeypatch.setattr(storage.config, "OUTPUT_DIR", str(tmp_path))
+    df = pd.DataFrame([{"symbol": "AAPL", "quantity": 2.0, "currency": "USD"}])
+
+    info = storage.save_snapshot_files(df, resource_name="prices", source="iol")
+
+    assert info["csv"] is None
+    parquet_path = Path(info["parquet"])
+    assert parquet_path.parent == tmp_path / "prices" / f"dt={info['dt']}" / "source=iol"
+    saved = pd.read_parquet(parquet_path)
+    assert list(saved["symbol"]) == ["AAPL"]
+    assert "snapshot_ts" in saved.columns
+
+
+def test_save_snapshot_files_auto_format_picks_feather_for_small_frames(tmp_path, monkeypatch):
+    monkeypatch.setattr(storage.config, "OUTPUT_DIR", str(tmp_path))
+    monkeypatch.setattr(storage, "SMALL_SNAPSHOT_MAX_ROWS", 2)
+
+    small = storage.save_snapshot_files(pd.DataFrame({"symbol": ["AAPL"]}), resource_name="fx", fmt="auto")
+    large = storage.save_snapshot_files(pd.DataFrame({"symbol": ["AAPL", "GGAL"]}), resource_name="fx", fmt="auto")
+
+    assert small["parquet"] is None
+    assert list(pd.read_feather(small["feather"])["symbol"]) == ["AAPL"]
+    assert large["feather"] is None
+    assert Path(large["parquet"]).exists()
+
+
+def test_save_snapshot_files_writes_csv_when_enabled_by_config(tmp_path, monkeypatch):
+    monkeypatch.setattr(storage.config, "OUTPUT_DIR", str(tmp_path))
+    monkeypatch.setattr(storage.config, "EMIT_CSV", True)
+
+    info = storage.save_snapshot_files(pd.DataFrame({"symbol": ["AAPL"]}), resource_name="fx")
+
+    assert Path(info["parquet"]).exists()
+    assert list(pd.read_csv(info["csv"])["symbol"]) == ["AAPL"]
+
+
+def test_maybe_upload_to_s3_multi_sends_parquet_from_memory(tmp_path, monkeypatch):
+    monkeypatch.setattr(storage.config, "OUTPUT_DIR", str(tmp_path))
+    frame = pd.DataFrame({"symbol": ["AAPL"]})
+    infos = {
+        "prices": storage.save_snapshot_files(frame, resource_name="prices", source="iol"),
+        "valuations": storage.save_snapshot_files(frame, resource_name="valuations", account_id="acct-1"),
+    }
+
+    class FakeS3:
+        def __init__(self):
+            self.objects = {}
+
+        def put_object(self, Bucket, Key, Body):
+            self.objects[Key] = Body
+
+        def upload_file(self, *args):
+            raise AssertionError("parquet should be uploaded from memory")
+
+    s3 = FakeS3()
+    monkeypatch.setattr(storage, "_s3_client", lambda settings=None: (s3, "bucket", "snapshots/"))
+
+    storage.maybe_upload_to_s3_multi(infos)
+
+    prices_path = Path(infos["prices"]["parquet"])
+    valuations_path = Path(infos["valuations"]["parquet"])
+    dt = infos["prices"]["dt"]
+    assert s3.objects == {
+        f"snapshots/prices/dt={dt}/source=iol/{prices_path.name}": prices_path.read_bytes(),
+        f"snapshots/valuations/dt={dt}/account=acct-1/{valuations_path.name}": valuations_path.read_bytes(),
+    }
+
+
+def test_maybe_upload_to_s3_puts_small_files_directly(tmp_path, monkeypatch):
+    csv_path = tmp_path / "fx.csv"
+    csv_path.write_text("symbol\nAAPL\n", encoding="utf-8")
+    uploaded = {}
+
+    class FakeS3:
+        def put_object(self, Bucket, Key, Body):
+            uploaded[Key] = Body
+
+        def upload_file(self, *args, **kwargs):
+            raise AssertionError("small files should not go through the transfer manager")
+
+    monkeypatch.setattr(storage, "_s3_client", lambda settings=None: (FakeS3(), "bucket", ""))
+
+    storage.maybe_upload_to_s3([str(csv_path), None], "2024-01-01", resource_name="fx", source="iol")
+
+    assert uploaded == {"fx/dt=2024-01-01/source=iol/fx.csv": b"symbol\nAAPL\n"}
+
+
+def test_save_snapshot_files_can_write_parquet_and_feather(tmp_path, monkeypatch):
+    monkeypatch.setattr(storage.config, "OUTPUT_DIR", str(tmp_path))
+
+    info = storage.save_snapshot_files(
+        pd.DataFrame({"symbol": ["AAPL"]}), resource_name="valuations", fmt="parquet+feather"
+    )
+
+    assert Path(info["parquet"]).read_bytes() == info["parquet_bytes"]
+    assert list(pd.read_feather(info["feather"])["symbol"]) == ["AAPL"]
+
+
+def test_save_snapshot_files_csv_uses_pandas_layout_and_float_format(tmp_path, monkeypatch):
+    monkeypatch.setattr(storage.config, "OUTPUT_DIR", str(tmp_path))
+    ts = datetime(2024, 1, 1, 12, 30, tzinfo=timezone.utc)
+
+    info = storage.save_snapshot_files(
+        pd.DataFrame({"symbol": ["AAPL"], "price": [1 / 3]}), resource_name="prices", snapshot_ts=ts, write_csv=True
+    )
+
+    assert Path(info["csv"]).read_text(encoding="utf-8").splitlines() == [
+        "symbol,price,snapshot_ts",
+        "AAPL,0.3333333333,2024-01-01T12:30:00Z",
+    ]
@@ -0,0 +1,97 @@
+from __future__ import annotations
+
+from datetime import date, datetime, timezone
+
+import pytest
+
+from backend.valuation.models import FXRate, Position, Price, compute_valuations
+
+SNAPSHOT_DT = date(2024, 1, 1)
+SNAPSHOT_TS = datetime(2024, 1, 1, tzinfo=timezone.utc)
+
+
+def _position(symbol: str, quantity: float) -> Position:
+    return Position(
+        snapshot_dt=SNAPSHOT_DT,
+        snapshot_ts=SNAPSHOT_TS,
+        account_id="acct",
+        source="iol",
+        symbol=symbol,
+        quantity=quantity,
+    )
+
+
+def _price(symbol: str, price: float, currency: str, quality_score: int = 100, source: str = "iol_api") -> Price:
+    return Price(
+        asof_dt=SNAPSHOT_DT,
+        symbol=symbol,
+        price_type="last",
+        price=price,
+        currency=currency,
+        source=source,
+        quality_score=quality_score,
+    )
+
+
+def test_compute_valuations_converts_prices_and_flags_missing_inputs():
+    positions = [
+        _position("AAPL", 2),
+        _position("GGAL", 10),
+        _position("BTC", 0.5),
+        _position("EURX", 3),
+        _position("NOPRICE", 1),
+    ]
+    prices = [
+        _price("AAPL", 150.0, "USD"),
+        _price("GGAL", 1000.0, "ARS", quality_score=50, source="low"),
+        _price("GGAL", 2000.0, "ARS", quality_score=90, source="high"),
+        _price("BTC", 30000.0, "USDT"),
+        _price("EURX", 10.0, "EUR"),
+    ]
+    fx_rates = [
+        FXRate(asof_dt=SNAPSHOT_DT, from_ccy="USD", to_ccy="ARS", rate=1000.0, source="blue"),
+        FXRate(asof_dt=SNAPSHOT_DT, from_ccy="USDT", to_ccy="USD", rate=1.0, source="peg"),
+    ]
+
+    valuations = compute_valuations(
+        positions, prices, fx_rates, base_currency="USD", snapshot_dt=SNAPSHOT_DT, computed_ts=SNAPSHOT_TS
+    )
+    by_symbol = {v.symbol: v for v in valuations}
+
+    assert [v.symbol for v in valuations] == ["AAPL", "GGAL", "BTC", "EURX", "NOPRICE"]
+    assert by_symbol["AAPL"].status == "ok"
+    assert by_symbol["AAPL"].fx_rate_to_base == 1.0
+    assert by_symbol["AAPL"].fx_source is None
+    assert by_symbol["AAPL"].value_base == pytest.approx(300.0)
+
+    assert by_symbol["GGAL"].price_source == "high"
+    assert by_symbol["GGAL"].fx_rate_to_base == pytest.approx(0.001)
+    assert by_symbol["GGAL"].fx_source == "blue"
+    assert by_symbol["GGAL"].value_base == pytest.approx(20.0)
+
+    assert by_symbol["BTC"].fx_source == "peg"
+    assert by_symbol["BTC"].value_base == pytest.approx(15000.0)
+
+    assert by_symbol["EURX"].status == "missing_input"
+    assert by_symbol["EURX"].unit_price_native == 10.0
+    assert by_symbol["EURX"].value_base is None
+
+    assert by_symbol["NOPRICE"].status == "missing_input"
+    assert by_symbol["NOPRICE"].unit_price_native is None
+    assert all(v.computed_ts == SNAPSHOT_TS and v.snapshot_dt == SNAPSHOT_DT for v in valuations)
+
+
+def test_compute_valuations_keeps_last_price_on_equal_quality():
+    prices = [
+        _price("AAPL", 100.0, "USD", quality_score=80, source="first"),
+        _price("AAPL", 90.0, "USD", quality_score=95, source="best"),
+        _price("AAPL", 110.0, "USD", quality_score=95, source="latest"),
+        _price("AAPL", 120.0, "USD", quality_score=10, source="stale"),
+    ]
+
+    (valuation,) = compute_valuations(
+        [_position("AAPL", 1)], prices, [], base_currency="USD", snapshot_dt=SNAPSHOT_DT, computed_ts=SNAPSHOT_TS
+    )
+
+    assert valuation.price_source == "latest"
+    assert valuation.value_base == 110.0
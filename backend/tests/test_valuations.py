@@ -1,5 +1,6 @@
 from __future__ import annotations
 
+import os
 from datetime import datetime
 from pathlib import Path
 
@@ -146,3 +147,55 @@ def test_get_latest_valuation_snapshot_missing_account(tmp_path, monkeypatch):
         valuations.get_latest_valuation_snapshot("missing")
 
     assert "missing" in str(excinfo.value)
+
+
+def test_get_latest_valuation_snapshot_prefers_feather_file(tmp_path, monkeypatch):
+    valuations_dir = tmp_path / "valuations"
+    rows = [
+        {
+            "snapshot_dt": "2024-11-15",
+            "computed_ts": "2024-11-15T08:30:00Z",
+            "symbol": "AAPL",
+            "quantity": 3,
+            "value_base": 1500.0,
+            "status": "ok",
+        }
+    ]
+    _write_snapshot(valuations_dir, "2024-11-15", "acc-123", [{**rows[0], "symbol": "STALE"}])
+    account_dir = valuations_dir / "dt=2024-11-15" / "account=acc-123"
+    feather_path = account_dir / "valuations_2024-11-15.feather"
+    pd.DataFrame(rows).to_feather(feather_path)
+    # Same stem means same run: the format preference applies even when the CSV is newer.
+    os.utime(feather_path, (1_000, 1_000))
+    os.utime(account_dir / "valuations_2024-11-15.csv", (2_000, 2_000))
+    monkeypatch.setattr(valuations, "VALUATIONS_DIR", valuations_dir)
+
+    response = valuations.get_latest_valuation_snapshot("acc-123")
+
+    assert response.source_file.endswith(".feather")
+    assert [row.symbol for row in response.rows] == ["AAPL"]
+
+
+def test_get_latest_valuation_snapshot_prefers_newer_run_over_stale_feather(tmp_path, monkeypatch):
+    valuations_dir = tmp_path / "valuations"
+    account_dir = valuations_dir / "dt=2024-11-15" / "account=acc-123"
+    account_dir.mkdir(parents=True)
+    row = {
+        "snapshot_dt": "2024-11-15",
+        "computed_ts": "2024-11-15T08:30:00Z",
+        "quantity": 3,
+        "value_base": 1500.0,
+        "status": "ok",
+    }
+    stale = account_dir / "valuations_2024-11-15_080000.feather"
+    pd.DataFrame([{**row, "symbol": "STALE"}]).to_feather(stale)
+    fresh = account_dir / "valuations_2024-11-15_090000.parquet"
+    pd.DataFrame([{**row, "symbol": "FRESH"}]).to_parquet(fresh, index=False)
+    os.utime(stale, (1_000, 1_000))
+    os.utime(fresh, (2_000, 2_000))
+    monkeypatch.setattr(valuations, "VALUATIONS_DIR", valuations_dir)
+
+    response = valuations.get_latest_valuation_snapshot("acc-123")
+
+    assert response.source_file.endswith(".parquet")
+    assert [r.symbol for r in response.rows] == ["FRESH"]
@@ -1,7 +1,7 @@
 from __future__ import annotations
 from datetime import date, datetime, timezone
 from typing import Optional, Literal, List, Dict, Iterable, Tuple
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, ConfigDict, Field
 
 AssetType = Literal[
     "equity", "cedear", "etf", "bond", "crypto", "fci", "cash", "other"
@@ -17,6 +17,8 @@ class Asset(BaseModel):
 
     One row per canonical symbol (your internal symbol).
     """
+    model_config = ConfigDict(frozen=True)
+
     symbol: str = Field(..., description="Canonical internal symbol (unique key).")
     display_name: Optional[str] = Field(None, description="Human-friendly name.")
     asset_type: AssetType = Field(..., description="Asset class/type.")
@@ -34,6 +36,8 @@ class Position(BaseModel):
     Holdings snapshot row (what you own), independent of price.
     Partition by snapshot_dt when writing to storage.
     """
+    model_config = ConfigDict(frozen=True)
+
     snapshot_dt: date = Field(..., description="Partition date for the snapshot (UTC date).")
     snapshot_ts: datetime = Field(..., description="Exact timestamp the snapshot was taken (UTC).")
 
@@ -62,6 +66,8 @@ class Price(BaseModel):
     Market price row (unit price in native currency).
     Partition by asof_dt for daily; keep asof_ts if you want higher frequency.
     """
+    model_config = ConfigDict(frozen=True)
+
     asof_dt: date = Field(..., description="Partition date (UTC date).")
     asof_ts: Optional[datetime] = Field(None, description="Timestamp of quote if available (UTC).")
 
@@ -83,6 +89,8 @@ class FXRate(BaseModel):
     FX conversion rate row.
     rate converts from_ccy -> to_ccy by multiplication (amount * rate).
     """
+    model_config = ConfigDict(frozen=True)
+
     asof_dt: date = Field(..., description="Partition date (UTC date).")
     from_ccy: CurrencyCode = Field(..., description="Source currency (e.g., ARS).")
     to_ccy: CurrencyCode = Field(..., description="Target/base currency (e.g., USD_MEP).")
@@ -96,6 +104,8 @@ class Valuation(BaseModel):
     Derived row for analytics: quantity * unit_price_native * fx_rate_to_base.
     Partition by snapshot_dt.
     """
+    model_config = ConfigDict(frozen=True)
+
     snapshot_dt: date = Field(..., description="Partition date (UTC date).")
     computed_ts: datetime = Field(..., description="When the valuation row was computed (UTC).")
 
@@ -137,82 +147,52 @@ def compute_valuations(
     computed_ts = computed_ts or datetime.now(timezone.utc)
     snapshot_dt = snapshot_dt or date.today()
 
-    price_lookup: Dict[str, Price] = {}
-    for price in prices:
-        current = price_lookup.get(price.symbol)
-        if current is None:
-            price_lookup[price.symbol] = price
-            continue
-        # prefer better quality, otherwise keep the first seen
-        if price.quality_score >= current.quality_score:
-            price_lookup[price.symbol] = price
-
-    fx_lookup: Dict[Tuple[CurrencyCode, CurrencyCode], FXRate] = {}
-    for fx in fx_rates:
-        fx_lookup[(fx.from_ccy, fx.to_ccy)] = fx
-
+    # Stable sort by quality: later (better) entries overwrite earlier ones, and on
+    # equal scores the last seen price wins.
+    price_lookup: Dict[str, Price] = {
+        price.symbol: price for price in sorted(prices, key=lambda p: p.quality_score)
+    }
+    # (from, to) -> (rate, source) for both directions; a quoted pair always wins
+    # over the inverse of its opposite, and the base currency converts at 1.0.
+    fx_lookup: Dict[Tuple[CurrencyCode, CurrencyCode], Tuple[float, Optional[str]]] = {
+        (fx.from_ccy, fx.to_ccy): (fx.rate, fx.source) for fx in fx_rates
+    }
+    for (from_ccy, to_ccy), (rate, source) in list(fx_lookup.items()):
+        if rate:
+            fx_lookup.setdefault((to_ccy, from_ccy), (1.0 / rate, source))
+    fx_lookup[(base_currency, base_currency)] = (1.0, None)
+
+    # Inputs are already validated models and the amounts are derived from them,
+    # so rows are built without re-running field validation.
     valuations: List[Valuation] = []
-
     for pos in positions:
         price = price_lookup.get(pos.symbol)
-        base_kwargs = dict(
-            snapshot_dt=snapshot_dt,
-            computed_ts=computed_ts,
-            account_id=pos.account_id,
-            source=pos.source,
-            market=pos.market,
-            symbol=pos.symbol,
-            asset_type=pos.asset_type,
-            quantity=pos.quantity,
-        )
-
-        if price is None:
-            valuations.append(Valuation(status="missing_input", **base_kwargs))
-            continue
-
-        fx_rate = 1.0
-        fx_source: Optional[str] = None
-        native_ccy = price.currency
-
-        if native_ccy != base_currency:
-            direct = fx_lookup.get((native_ccy, base_currency))
-            if direct:
-                fx_rate = direct.rate
-                fx_source = direct.source
-            else:
-                inverse = fx_lookup.get((base_currency, native_ccy))
-                if inverse and inverse.rate:
-                    fx_rate = 1.0 / inverse.rate
-                    fx_source = inverse.source
-                else:
-                    valuations.append(
-                        Valuation(
-                            unit_price_native=price.price,
-                            unit_price_native_ccy=native_ccy,
-                            price_source=price.source,
-                            price_quality_score=price.quality_score,
-                            status="missing_input",
-                            **base_kwargs,
-                        )
-                    )
-                    continue
-
-        unit_price_base = price.price * fx_rate if fx_rate is not None else None
-        value_base = unit_price_base * pos.quantity if unit_price_base is not None else None
-
-        valuations.append(
-            Valuation(
-                unit_price_native=price.price,
-                unit_price_native_ccy=native_ccy,
-                fx_rate_to_base=fx_rate,
-                unit_price_base=unit_price_base,
-                value_base=value_base,
-                price_source=price.source,
-                price_quality_score=price.quality_score,
-                fx_source=fx_source,
-                status="ok" if unit_price_base is not None else "missing_input",
-                **base_kwargs,
-            )
-        )
+        # One dict per row, filled in as inputs are found, feeding a single construct call.
+        row = {
+            "snapshot_dt": snapshot_dt,
+            "computed_ts": computed_ts,
+            "account_id": pos.account_id,
+            "source": pos.source,
+            "market": pos.market,
+            "symbol": pos.symbol,
+            "asset_type": pos.asset_type,
+            "quantity": pos.quantity,
+            "status": "missing_input",
+        }
+        if price is not None:
+            row["unit_price_native"] = price.price
+            row["unit_price_native_ccy"] = price.currency
+            row["price_source"] = price.source
+            row["price_quality_score"] = price.quality_score
+            fx = fx_lookup.get((price.currency, base_currency))
+            if fx is not None:
+                fx_rate, fx_source = fx
+                unit_price_base = price.price * fx_rate
+                row["fx_rate_to_base"] = fx_rate
+                row["fx_source"] = fx_source
+                row["unit_price_base"] = unit_price_base
+                row["value_base"] = unit_price_base * pos.quantity
+                row["status"] = "ok"
+        valuations.append(Valuation.model_construct(**row))
 
     return valuations
@@ -16,38 +16,45 @@ from __future__ import annotations
 
 import argparse
 import sys
-from typing import Iterable, List
+from concurrent.futures import ThreadPoolExecutor
+from typing import Iterable, List, Union
 
-from backend.core.santander_nav import (
-    FundShareValue,
-    build_session,
-    fetch_share_value,
-)
+from backend.core import santander_nav
+from backend.core.santander_nav import FundShareValue, fetch_share_value
 
 ShareValue = FundShareValue
 
 
 def fetch_share_values(fund_ids: Iterable[str]) -> List[ShareValue]:
     """Fetch share values for each fund id and return structured results."""
-    session = build_session()
-    return [fetch_share_value(session, fund_id) for fund_id in fund_ids]
+    # Repeated notebook calls reuse the backend's module-level session and its connections.
+    return santander_nav.fetch_share_values(fund_ids)
+
+
+def _fetch_or_error(fund_id: str) -> Union[ShareValue, RuntimeError]:
+    try:
+        return fetch_share_value(santander_nav._SESSION, fund_id)
+    except RuntimeError as exc:
+        return exc
 
 
 def run(fund_ids: Iterable[str]) -> int:
     """CLI entry point that prints the fetched values."""
-    session = build_session()
+    fund_ids = list(fund_ids)
+    with ThreadPoolExecutor(max_workers=santander_nav.MAX_CONCURRENT_FUND_REQUESTS) as executor:
+        results = list(executor.map(_fetch_or_error, fund_ids))
+
     exit_code = 0
-    for fund_id in fund_ids:
-        try:
-            share_value = fetch_share_value(session, fund_id)
-            label = share_value["fund_name"] or f"Fund {fund_id}"
-            print(
-                f"{label} (Fund {fund_id}): {share_value['current_share_value']:.6f} "
-                f"(as of {share_value['current_share_value_date']})"
-            )
-        except RuntimeError as exc:
+    for fund_id, share_value in zip(fund_ids, results):
+        if isinstance(share_value, RuntimeError):
             exit_code = 1
-            print(str(exc), file=sys.stderr)
+            print(str(share_value), file=sys.stderr)
+            continue
+        label = share_value["fund_name"] or f"Fund {fund_id}"
+        print(
+            f"{label} (Fund {fund_id}): {share_value['current_share_value']:.6f} "
+            f"(as of {share_value['current_share_value_date']})"
+        )
     return exit_code
 
 